@@ -0,0 +1,62 @@
+"""Сравнение бэкендов парсинга wiki-таблиц по скорости (rows/sec).
+
+Запуск из корня репозитория:
+    python benchmarks/bench_parsers.py [--repeat 5] [--scale 1 --scale 10] [--no-recorded]
+
+Для каждой страницы проверяется, что все бэкенды возвращают те же строки, что и "bs4".
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wiki_parsers import PARSER_BACKENDS  # noqa: E402
+from fixtures import recorded_pages, synthetic_pages  # noqa: E402
+
+REFERENCE_BACKEND = "bs4"
+
+
+def _comparable(rows):
+    return [{k: (str(v) if k == 'error' else v) for k, v in row.items()} for row in rows]
+
+def bench_backend(extract, content, repeat):
+    best = float("inf")
+    rows = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = list(extract(content))
+        best = min(best, time.perf_counter() - start)
+    return rows, best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="повторов на замер (берется лучший)")
+    parser.add_argument("--scale", type=int, action="append", help="масштаб синтетических страниц (можно несколько)")
+    parser.add_argument("--no-recorded", action="store_true", help="не использовать сохраненные страницы")
+    args = parser.parse_args()
+
+    page_sets = {} if args.no_recorded else recorded_pages()
+    for scale in args.scale or [1, 10]:
+        page_sets.update(synthetic_pages(scale))
+
+    print(f"{'pages':<40} {'kind':<15} {'backend':<10} {'rows':>7} {'time, ms':>10} {'rows/sec':>10}  same")
+    mismatches = 0
+    for name, pages in page_sets.items():
+        for kind, content in pages.items():
+            reference = None
+            for backend_name, backend in PARSER_BACKENDS.items():
+                rows, elapsed = bench_backend(backend[kind], content, args.repeat)
+                if backend_name == REFERENCE_BACKEND:
+                    reference = _comparable(rows)
+                same = reference is None or _comparable(rows) == reference
+                mismatches += not same
+                rate = len(rows) / elapsed if elapsed else float("inf")
+                print(f"{name[-40:]:<40} {kind:<15} {backend_name:<10} {len(rows):>7} {elapsed * 1000:>10.1f} {rate:>10.0f}  {'yes' if same else 'NO'}")
+    if mismatches:
+        print(f"{mismatches} backend results differ from {REFERENCE_BACKEND}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
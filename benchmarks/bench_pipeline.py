@@ -0,0 +1,202 @@
+"""Офлайн-бенчмарк всего пути данных: скрейпинг -> агрегация -> HTML-таблицы.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_pipeline.py [--scale 1 --scale 10 --scale 100] [--repeat 3] [--no-recorded]
+
+Страницы Leaguepedia, ответы Riot API и листы Google Sheets берутся из фикстур
+(см. fixtures.py) и проходят через тот же код, что и в приложении. Для каждого
+этапа печатается время (лучший из --repeat прогонов), строк/сек и пиковая память
+(tracemalloc, отдельным прогоном).
+"""
+import os
+import sys
+import time
+import argparse
+import itertools
+import tempfile
+import tracemalloc
+import pandas as pd
+
+os.environ.setdefault("DDRAGON_OFFLINE", "1")  # Иконки - только с диска, без запросов к CDN
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data_fetching  # noqa: E402
+from data_fetching import new_scrape_state, fetch_match_history_data, fetch_draft_data  # noqa: E402
+from game_facts import DUO_PAIRS, build_games_table, build_team_data, build_team_drafts, build_team_summaries  # noqa: E402
+from soloq import (team_rosters, SOLOQ_COLUMNS, parse_match_row, aggregate_soloq_data, player_champion_stats,  # noqa: E402
+                   SheetsSoloQStorage)
+from soloq_storage import SqliteSoloQStorage  # noqa: E402
+from renderers import (role_rows_table_html, ban_rows_table_html, duo_rows_table_html,  # noqa: E402
+                       draft_table_html, soloq_stats_table_html, cached_section)
+from fixtures import (recorded_pages, synthetic_pages, replay_pages, synthetic_riot_matches, recorded_riot_matches,  # noqa: E402
+                      recorded_sheet_values, FixtureSpreadsheet)
+
+SOLOQ_TEAM = "Unicorns of Love Sexy Edition"
+REPLAY_TOURNAMENT = "replay"
+_dataset_versions = itertools.count(1)
+
+
+def measure(func, repeat):
+    """(результат, лучшее время, пиковая память в байтах)."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, best, peak
+
+def _quiet(func):
+    # Скрейпер печатает строку на каждую игру - в отчете бенчмарка это шум
+    def wrapper(*args, **kwargs):
+        stdout = sys.stdout
+        with open(os.devnull, "w") as devnull:
+            sys.stdout = devnull
+            try:
+                return func(*args, **kwargs)
+            finally:
+                sys.stdout = stdout
+    return wrapper
+
+# --- Этапы Leaguepedia ---
+def leaguepedia_stages(page_sets, max_drafts):
+    """[(этап, функция, число строк результата)] для страниц всех турниров."""
+    data_fetching.TOURNAMENT_URLS = {name: {kind: name for kind in pages} for name, pages in page_sets.items()}
+    pages = {(name, kind): content for name, kind_pages in page_sets.items() for kind, content in kind_pages.items()}
+
+    scrape_mh = _quiet(lambda: fetch_match_history_data(pages, new_scrape_state()))
+    scrape_pb = _quiet(lambda: fetch_draft_data(pages, new_scrape_state()))
+    mh_games, pb_games = scrape_mh(), scrape_pb()
+    games = build_games_table(mh_games, pb_games)
+    team_data = build_team_data(games)
+    team_drafts = build_team_drafts(games)
+    summaries = build_team_summaries(games, team_data, team_drafts)
+
+    def render_team_pages():
+        # Все секции страницы команды, как при открытых Picks/Bans/Duo Picks/Drafts
+        tables = 0
+        for team, summary in summaries.items():
+            drafts = [draft for _, series in summary['series'] for draft in series]
+            html = [role_rows_table_html(rows) for rows in summary['roles'].values()]
+            html += [ban_rows_table_html(rows) for rows in summary['bans'].values()]
+            html += [duo_rows_table_html(summary['duos'].rows(pair), pair) for pair in DUO_PAIRS]
+            html += [draft_table_html(draft, team) for draft in drafts[:max_drafts]]
+            tables += sum(1 for table in html if table)
+        return tables
+
+    # Каждый набор фикстур - своя "версия датасета", чтобы кэш не отдавал таблицы другого масштаба
+    version = next(_dataset_versions)
+
+    def rerender_team_sections():
+        # Перезапуск страницы без нового датасета: Picks/Bans/Duo Picks берутся из кэша по версии
+        # (первый прогон замера заполняет кэш, лучший из --repeat - попадания)
+        tables = 0
+        for team, summary in summaries.items():
+            sections = [
+                cached_section(team, "picks", version, lambda: {role: role_rows_table_html(rows) for role, rows in summary['roles'].items()}),
+                cached_section(team, "bans", version, lambda: {name: ban_rows_table_html(rows) for name, rows in summary['bans'].items()}),
+                cached_section(team, "duo_picks", version, lambda: {pair: duo_rows_table_html(summary['duos'].rows(pair), pair) for pair in DUO_PAIRS}),
+            ]
+            tables += sum(1 for fragments in sections for table in fragments.values() if table)
+        return tables
+
+    return [
+        ("scrape match history", scrape_mh, lambda result: len(result)),
+        ("scrape picks and bans", scrape_pb, lambda result: len(result)),
+        ("build games table", lambda: build_games_table(mh_games, pb_games), lambda result: len(result)),
+        ("team stats view", lambda: build_team_data(games), lambda result: len(games)),
+        ("team drafts view", lambda: build_team_drafts(games), lambda result: sum(len(d) for d in result.values())),
+        ("team summaries", lambda: build_team_summaries(games, team_data, team_drafts), lambda result: len(result)),
+        ("render team pages", render_team_pages, lambda result: result),
+        ("rerender team sections", rerender_team_sections, lambda result: result),
+    ]
+
+def replay_stages(scale):
+    """Инкрементальный скрейпинг страниц, растущих по ходу сезона (новые игры сверху) и затем исправленных.
+
+    Итоговая таблица игр должна совпасть с разбором последних страниц с нуля - иначе AssertionError.
+    """
+    steps = replay_pages(scale)
+
+    def scrape(kind_pages, mh_state, pb_state):
+        pages = {(REPLAY_TOURNAMENT, kind): content for kind, content in kind_pages.items()}
+        return build_games_table(fetch_match_history_data(pages, mh_state), fetch_draft_data(pages, pb_state))
+
+    @_quiet
+    def replay():
+        data_fetching.TOURNAMENT_URLS = {REPLAY_TOURNAMENT: {kind: kind for kind in steps[0]}}
+        mh_state, pb_state = new_scrape_state(), new_scrape_state()
+        for kind_pages in steps:
+            games = scrape(kind_pages, mh_state, pb_state)
+        pd.testing.assert_frame_equal(games, scrape(steps[-1], new_scrape_state(), new_scrape_state()))
+        return games
+
+    return [("incremental replay", replay, lambda result: len(result))]
+
+# --- Этапы SoloQ ---
+def soloq_stages(riot_matches, sheet_values):
+    roster = team_rosters[SOLOQ_TEAM]
+
+    def parse_matches():
+        return {player: [parse_match_row(match, data['puuid'], match['metadata']['matchId']) for match in data['matches']]
+                for player, data in riot_matches.items()}
+
+    if not sheet_values:
+        sheet_values = {player: [SOLOQ_COLUMNS] + rows for player, rows in parse_matches().items()}
+    total_rows = sum(max(len(values) - 1, 0) for values in sheet_values.values())
+
+    # История в SQLite во временном каталоге, заполненная из листов (как при первом запуске)
+    storage = SqliteSoloQStorage(os.path.join(tempfile.mkdtemp(prefix="soloq-bench-"), "history.sqlite"))
+    storage.add_rows({player: values[1:] for player, values in sheet_values.items()})
+
+    def render_player_tables():
+        # Как на странице SoloQ: хранилище -> DataFrame -> статистика по чемпионам -> таблица
+        tables = 0
+        for player, df in storage.team_games(roster).items():
+            if not df.empty:
+                tables += soloq_stats_table_html(player_champion_stats(df, roster[player]["role"])) is not None
+        return tables
+
+    return [
+        ("parse riot matches", parse_matches, lambda result: sum(len(rows) for rows in result.values())),
+        ("aggregate soloq (sheets)", lambda: aggregate_soloq_data(SheetsSoloQStorage(FixtureSpreadsheet(sheet_values)), SOLOQ_TEAM),
+         lambda result: total_rows),
+        ("aggregate soloq (sqlite)", lambda: aggregate_soloq_data(storage, SOLOQ_TEAM), lambda result: total_rows),
+        ("render soloq tables", render_player_tables, lambda result: total_rows),
+    ]
+
+def run_stages(label, stages, repeat):
+    for stage, func, count_rows in stages:
+        result, elapsed, peak = measure(func, repeat)
+        rows = count_rows(result)
+        rate = rows / elapsed if elapsed else float("inf")
+        print(f"{label[-24:]:<24} {stage:<24} {rows:>8} {elapsed * 1000:>10.1f} {rate:>11.0f} {peak / 2**20:>9.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="повторов на замер (берется лучший)")
+    parser.add_argument("--scale", type=int, action="append", help="масштаб синтетических фикстур (можно несколько)")
+    parser.add_argument("--no-recorded", action="store_true", help="не использовать сохраненные фикстуры")
+    parser.add_argument("--max-drafts", type=int, default=100, help="сколько драфтов рендерить на команду")
+    args = parser.parse_args()
+
+    print(f"{'fixtures':<24} {'stage':<24} {'rows':>8} {'time, ms':>10} {'rows/sec':>11} {'peak, MiB':>9}")
+    if not args.no_recorded:
+        page_sets = recorded_pages()
+        if page_sets:
+            run_stages("recorded", leaguepedia_stages(page_sets, args.max_drafts), args.repeat)
+        riot_matches, sheet_values = recorded_riot_matches(), recorded_sheet_values()
+        if riot_matches or sheet_values:
+            run_stages("recorded", soloq_stages(riot_matches, sheet_values), args.repeat)
+
+    for scale in args.scale or [1, 10, 100]:
+        run_stages(f"synthetic-{scale}x", leaguepedia_stages(synthetic_pages(scale), args.max_drafts), args.repeat)
+        run_stages(f"synthetic-{scale}x", replay_stages(scale), args.repeat)
+        run_stages(f"synthetic-{scale}x", soloq_stages(synthetic_riot_matches(team_rosters[SOLOQ_TEAM], scale), None), args.repeat)
+
+if __name__ == "__main__":
+    main()
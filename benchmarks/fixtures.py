@@ -0,0 +1,306 @@
+"""Фикстуры для бенчмарков: страницы Leaguepedia, ответы Riot API и значения Google Sheets.
+
+Страницы берутся из benchmarks/fixtures/*.html (сохраненные вручную) и из
+дискового HTTP-кэша приложения (data/http_cache). Если реальных страниц нет,
+генерируются синтетические с той же разметкой, что у Match_History и Picks_and_Bans.
+
+Ответы match-v5 - из benchmarks/fixtures/riot/<player>.json ({"puuid", "matches"}),
+листы игроков - из benchmarks/fixtures/sheets/<player>.json (список строк);
+без них тоже генерируются синтетические.
+"""
+import os
+import glob
+import json
+import random
+import itertools
+import gspread
+import requests
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+TEAMS = [
+    "Dung Dynasty", "Eintracht Spandau", "ROSSMANN Centaurs", "Unicorns of Love Sexy Edition",
+    "Kaufland Hangry Knights", "Berlin International Gaming", "Eintracht Frankfurt",
+    "Austrian Force willhaben", "E Wie Einfach E-sports", "teamorangegaming",
+]
+CHAMPIONS = [
+    "Aatrox", "Ahri", "Azir", "Bard", "Camille", "Corki", "Ezreal", "Gnar", "Jarvan IV", "Jax",
+    "Jayce", "Kai'Sa", "Kalista", "K'Sante", "LeBlanc", "Lee Sin", "Lucian", "Maokai", "Nautilus",
+    "Orianna", "Rakan", "Renekton", "Rell", "Sejuani", "Skarner", "Syndra", "Taliyah", "Varus",
+    "Vi", "Wukong", "Xayah", "Xin Zhao", "Yone", "Zeri", "Ziggs", "Rumble", "Poppy", "Alistar",
+]
+GAMES_PER_WEEK = 20
+
+
+def _sprite(champ):
+    return f'<span class="sprite champion-sprite" title="{champ}" style="background-position:0 0"></span>'
+
+# Для этих чемпионов на P/B странице оставляем только data-champion (без title у спрайта)
+DATA_CHAMPION_ONLY = {"Wukong", "Kai'Sa", "Jarvan IV", "Lee Sin"}
+
+def _pbh(champ):
+    data_champ = champ.replace(" ", "").replace("'", "")
+    if champ in DATA_CHAMPION_ONLY:
+        return f'<span class="pbh-cn" data-champion="{data_champ}"><span class="sprite champion-sprite"></span></span>'
+    return f'<span class="pbh-cn" data-champion="{data_champ}">{_sprite(champ)}</span>'
+
+def _team_link(team):
+    return f'<a href="/wiki/{team.replace(" ", "_")}" title="{team}"><img alt="{team}logo std.png" src="x.png"></a>'
+
+def synthetic_games(scale=1, seed=42):
+    """Детерминированный список игр: scale=1 - примерно один сплит (10 недель по 20 игр)."""
+    rnd = random.Random(seed)
+    games = []
+    for week in range(1, 10 * scale + 1):
+        for _ in range(GAMES_PER_WEEK):
+            blue, red = rnd.sample(TEAMS, 2)
+            picked = rnd.sample(CHAMPIONS, 20)
+            games.append({
+                'week': week,
+                'date': f"2025-{1 + (week // 4) % 12:02d}-{1 + week % 28:02d}",
+                'patch': f"15.{1 + week % 20}",
+                'blue': blue, 'red': red,
+                'winner': rnd.choice(('blue', 'red')),
+                'blue_bans': picked[0:5], 'red_bans': picked[5:10],
+                'blue_picks': picked[10:15], 'red_picks': picked[15:20],
+                'vod': f"https://www.youtube.com/watch?v={rnd.randrange(10**9)}",
+            })
+    return games
+
+def render_match_history_page(games):
+    rows = []
+    for g in games:
+        winner = g['blue'] if g['winner'] == 'blue' else g['red']
+        cells = [
+            g['date'], g['patch'], _team_link(g['blue']), _team_link(g['red']), _team_link(winner),
+            "".join(_sprite(c) for c in g['blue_bans']), "".join(_sprite(c) for c in g['red_bans']),
+            "".join(_sprite(c) for c in g['blue_picks']), "".join(_sprite(c) for c in g['red_picks']),
+            '<a href="/wiki/Scoreboards">SB</a>', f'<a href="{g["vod"]}">VOD</a>',
+        ]
+        rows.append("<tr>" + "".join(f"<td>{c}</td>" for c in cells) + "</tr>")
+    header = "<tr>" + "".join(f"<th>{h}</th>" for h in ("Date", "P", "Blue", "Red", "Winner", "Bans", "Bans", "Picks", "Picks", "SB", "VOD")) + "</tr>"
+    return (f'<html><head><meta charset="UTF-8"></head><body>'
+            f'<table class="wikitable mhgame sortable">{header}{"".join(rows)}</table></body></html>').encode("utf-8")
+
+def render_picks_and_bans_page(games):
+    rows = []
+    for g in games:
+        bb, rb, bp, rp = g['blue_bans'], g['red_bans'], g['blue_picks'], g['red_picks']
+        blue_cls = "pbh-blue pbh-winner" if g['winner'] == 'blue' else "pbh-blue"
+        red_cls = "pbh-red pbh-winner" if g['winner'] == 'red' else "pbh-red"
+        cells = [
+            f"<td>{g['week']}</td>",
+            f'<td class="{blue_cls}" title="{g["blue"]}">{g["blue"]}</td>',
+            f'<td class="{red_cls}" title="{g["red"]}">{g["red"]}</td>',
+            "<td>1 - 0</td>", f"<td>{g['patch']}</td>",
+            # 5..10: BB1 RB1 BB2 RB2 BB3 RB3
+            *(f"<td>{_pbh(c)}</td>" for pair in zip(bb[:3], rb[:3]) for c in pair),
+            f"<td>{_pbh(bp[0])}</td>", f"<td>{_pbh(rp[0])}{_pbh(rp[1])}</td>",
+            f"<td>{_pbh(bp[1])}{_pbh(bp[2])}</td>", f"<td>{_pbh(rp[2])}</td>",
+            # 15..18: RB4 BB4 RB5 BB5
+            f"<td>{_pbh(rb[3])}</td>", f"<td>{_pbh(bb[3])}</td>", f"<td>{_pbh(rb[4])}</td>", f"<td>{_pbh(bb[4])}</td>",
+            f"<td>{_pbh(rp[3])}</td>", f"<td>{_pbh(bp[3])}{_pbh(bp[4])}</td>", f"<td>{_pbh(rp[4])}</td>",
+            '<td><a href="/wiki/Prime_League/Scoreboards">SB</a></td>', f'<td><a href="{g["vod"]}">VOD</a></td>',
+        ]
+        rows.append("<tr>" + "".join(cells) + "</tr>")
+    header = "<tr>" + "<th>H</th>" * 24 + "</tr>"
+    return (f'<html><head><meta charset="UTF-8"></head><body>'
+            f'<table class="wikitable plainlinks hoverable-rows column-show-hide-1">{header}{"".join(rows)}</table>'
+            f'</body></html>').encode("utf-8")
+
+def synthetic_pages(scale=1):
+    games = synthetic_games(scale)
+    return {
+        f"synthetic-{scale}x": {
+            "match_history": render_match_history_page(games),
+            "picks_and_bans": render_picks_and_bans_page(games),
+        }
+    }
+
+REPLAY_STEPS = 10
+
+def _edited_seasons(games):
+    """Правки уже опубликованных строк после конца сезона: исправленный пик, исправленный победитель, удаленная игра."""
+    edited = list(games)
+    game = edited[5]
+    replacement = next(c for c in CHAMPIONS if c not in game['blue_bans'] + game['red_bans'] + game['blue_picks'] + game['red_picks'])
+    edited[5] = {**game, 'blue_picks': [replacement] + game['blue_picks'][1:]}
+    yield edited
+    edited = list(edited)
+    edited[7] = {**edited[7], 'winner': 'red' if edited[7]['winner'] == 'blue' else 'blue'}
+    yield edited
+    yield edited[:9] + edited[10:]
+
+def replay_pages(scale=1, steps=REPLAY_STEPS, newest_first=True):
+    """Страницы одного турнира по ходу сезона: [{kind: content}] после каждой из steps порций недель,
+    затем после правок уже опубликованных строк (см. _edited_seasons).
+
+    newest_first - как на Leaguepedia: новые игры дописываются в начало страницы.
+    """
+    games = synthetic_games(scale)
+    weeks = games[-1]['week']
+    seasons = [[g for g in games if g['week'] <= weeks * step // steps] for step in range(1, steps + 1)]
+    result = []
+    for played in seasons + list(_edited_seasons(games)):
+        if newest_first:
+            played = played[::-1]
+        result.append({
+            "match_history": render_match_history_page(played),
+            "picks_and_bans": render_picks_and_bans_page(played),
+        })
+    return result
+
+def _page_kind(url_or_name):
+    if "Match_History" in url_or_name or "match_history" in url_or_name:
+        return "match_history"
+    if "Picks_and_Bans" in url_or_name or "picks_and_bans" in url_or_name:
+        return "picks_and_bans"
+    return None
+
+def recorded_pages(http_cache_dir=os.path.join("data", "http_cache")):
+    """Реальные страницы: benchmarks/fixtures/<name>_{match_history,picks_and_bans}.html и HTTP-кэш приложения."""
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.html"))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        kind = _page_kind(name)
+        if kind:
+            with open(path, "rb") as f:
+                pages.setdefault(name.replace(kind, "").strip("_-") or "fixture", {})[kind] = f.read()
+    for meta_path in sorted(glob.glob(os.path.join(http_cache_dir, "*.json"))):
+        with open(meta_path, "r", encoding="utf-8") as f:
+            url = json.load(f).get("url", "")
+        kind = _page_kind(url)
+        body_path = meta_path[:-len(".json")] + ".html"
+        if kind and os.path.exists(body_path):
+            with open(body_path, "rb") as f:
+                pages.setdefault(url.rsplit("/", 1)[0], {})[kind] = f.read()
+    return pages
+
+
+# --- Riot API и Google Sheets ---
+SOLOQ_ROLES = ["TOP", "JUNGLE", "MIDDLE", "BOTTOM", "UTILITY"]
+# Одна страница match-ids (count=100) на игрока при scale=1
+MATCHES_PER_PLAYER = 100
+
+def _riot_participant(puuid, champion, position, win, rnd):
+    return {
+        'puuid': puuid, 'championName': champion, 'teamPosition': position, 'win': win,
+        'kills': rnd.randrange(15), 'deaths': rnd.randrange(12), 'assists': rnd.randrange(20),
+    }
+
+def synthetic_riot_matches(roster, scale=1, seed=7):
+    """{player: {'puuid', 'matches': [ответ match-v5, ...]}} для игроков ростера (role - из ростера)."""
+    rnd = random.Random(seed)
+    champions = [c.replace(" ", "").replace("'", "") for c in CHAMPIONS]
+    result = {}
+    for player_index, (player, player_data) in enumerate(roster.items()):
+        puuid = f"puuid-{player_index}"
+        matches = []
+        for n in range(MATCHES_PER_PLAYER * scale):
+            picked = rnd.sample(champions, 10)
+            puuids = [puuid] + [f"puuid-{player_index}-{n}-{k}" for k in range(9)]
+            rnd.shuffle(puuids)
+            blue_win = rnd.random() < 0.5
+            participants = []
+            for k, participant_puuid in enumerate(puuids):
+                # Игрок обычно на своей роли, но иногда играет другую (отфильтровывается при агрегации)
+                position = SOLOQ_ROLES[k % 5]
+                if participant_puuid == puuid:
+                    position = player_data['role'] if rnd.random() < 0.9 else rnd.choice(SOLOQ_ROLES)
+                participants.append(_riot_participant(participant_puuid, picked[k], position, blue_win == (k < 5), rnd))
+            matches.append({
+                'metadata': {'matchId': f"EUW1_{player_index}{n:07d}", 'participants': puuids},
+                'info': {'gameCreation': 1735689600000 + (n * 5400 + player_index * 60) * 1000, 'participants': participants},
+            })
+        result[player] = {'puuid': puuid, 'matches': matches}
+    return result
+
+def recorded_riot_matches():
+    return _load_json_dir(os.path.join(FIXTURES_DIR, "riot"))
+
+def recorded_sheet_values():
+    return _load_json_dir(os.path.join(FIXTURES_DIR, "sheets"))
+
+def _load_json_dir(path):
+    result = {}
+    for json_path in sorted(glob.glob(os.path.join(path, "*.json"))):
+        with open(json_path, "r", encoding="utf-8") as f:
+            result[os.path.splitext(os.path.basename(json_path))[0]] = json.load(f)
+    return result
+
+_fixture_ids = itertools.count(1)
+
+def _error_response(status, message):
+    response = requests.Response()
+    response.status_code = status
+    response._content = json.dumps({"error": {"code": status, "message": message, "status": "INVALID_ARGUMENT"}}).encode("utf-8")
+    return response
+
+def _trim_row(row):
+    row = list(row)
+    while row and row[-1] == "":
+        row.pop()
+    return row
+
+class FixtureWorksheet:
+    """Лист Google Sheets в памяти: те же методы, что использует приложение; значения - строки, как отдает Sheets."""
+    def __init__(self, title, values=None, spreadsheet_id=None, sheet_id=0):
+        self.title = title
+        self.spreadsheet_id = spreadsheet_id
+        self.id = sheet_id
+        self.values = [[str(v) for v in row] for row in (values or [])]
+
+    def get_all_values(self):
+        return [list(row) for row in self.values]
+
+    def col_values(self, col):
+        return [row[col - 1] for row in self.values if len(row) >= col]
+
+    def append_row(self, row):
+        self.values.append([str(v) for v in row])
+
+    def append_rows(self, rows):
+        for row in rows:
+            self.append_row(row)
+
+class FixtureSpreadsheet:
+    def __init__(self, sheets):
+        self.id = f"fixture-{next(_fixture_ids)}"
+        self.sheets = {}
+        for name, values in sheets.items():
+            self.add_worksheet(name, rows=1200, cols=10).values = [[str(v) for v in row] for row in values]
+
+    def values_batch_get(self, ranges):
+        value_ranges = []
+        for sheet_range in ranges:
+            title = sheet_range.rsplit("!", 1)[0].strip("'").replace("''", "'")
+            # Как Sheets API: несуществующий лист - ошибка 400 всего запроса, пустые ячейки в конце строки не отдаются
+            if title not in self.sheets:
+                raise gspread.exceptions.APIError(_error_response(400, f"Unable to parse range: {sheet_range}"))
+            worksheet = self.sheets[title]
+            values = [row[:8] for row in worksheet.values]
+            while values and not any(values[-1]):
+                values.pop()
+            value_ranges.append({'range': sheet_range, 'values': [_trim_row(row) for row in values]})
+        return {'valueRanges': value_ranges}
+
+    def worksheet(self, name):
+        if name not in self.sheets:
+            raise gspread.exceptions.WorksheetNotFound(name)
+        return self.sheets[name]
+
+    def worksheets(self):
+        return list(self.sheets.values())
+
+    def add_worksheet(self, title, rows, cols):
+        self.sheets[title] = FixtureWorksheet(title, spreadsheet_id=self.id, sheet_id=len(self.sheets) + 1)
+        return self.sheets[title]
+
+    def batch_update(self, body):
+        # Из запросов batchUpdate приложение использует только appendCells
+        by_id = {worksheet.id: worksheet for worksheet in self.sheets.values()}
+        for request in body['requests']:
+            append = request['appendCells']
+            for row in append['rows']:
+                by_id[append['sheetId']].append_row([next(iter(cell['userEnteredValue'].values())) for cell in row['values']])
+        return {'replies': [{} for _ in body['requests']]}
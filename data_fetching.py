@@ -0,0 +1,548 @@
+import os
+import re
+import json
+import time
+import hashlib
+import functools
+import threading
+import yaml
+import requests
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+from collections import defaultdict, namedtuple
+import pandas as pd
+from wiki_parsers import extract_match_history_rows, extract_picks_and_bans_rows
+from game_facts import ROLES, role_column, records_to_frame, build_games_table, build_team_views
+
+# Список URL для разных этапов турнира
+TOURNAMENT_URLS = {
+    "Spring Split": {
+        "match_history": "https://lol.fandom.com/wiki/Prime_League_1st_Division/2025_Season/Spring_Split/Match_History",
+        "picks_and_bans": "https://lol.fandom.com/wiki/Prime_League_1st_Division/2025_Season/Spring_Split/Picks_and_Bans"
+    }
+}
+
+# --- Дисковый HTTP-кэш для страниц Leaguepedia ---
+HTTP_CACHE_DIR = os.path.join("data", "http_cache")
+# Сколько секунд считаем страницу свежей без повторной проверки (защита от троттлинга Fandom)
+HTTP_CACHE_FRESH_SECONDS = 60
+REQUEST_HEADERS = {'User-Agent': 'Mozilla/5.0'}
+
+def _http_cache_paths(url):
+    key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    return os.path.join(HTTP_CACHE_DIR, f"{key}.html"), os.path.join(HTTP_CACHE_DIR, f"{key}.json")
+
+def load_cached_page(url):
+    """Возвращает (тело, метаданные) страницы из кэша или (None, {}), если записи нет."""
+    body_path, meta_path = _http_cache_paths(url)
+    if not (os.path.exists(body_path) and os.path.exists(meta_path)):
+        return None, {}
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        with open(body_path, "rb") as f:
+            body = f.read()
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Broken HTTP cache entry for {url}: {e}")
+        return None, {}
+    return body, meta
+
+def _write_cache_meta(meta_path, meta):
+    tmp_path = f"{meta_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, meta_path)
+
+def store_cached_page(url, response):
+    """Сохраняет тело ответа и его валидаторы (ETag/Last-Modified) на диск."""
+    os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+    body_path, meta_path = _http_cache_paths(url)
+    tmp_path = f"{body_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(response.content)
+    os.replace(tmp_path, body_path)
+    _write_cache_meta(meta_path, {
+        'url': url,
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'checked_at': time.time(),
+    })
+
+def fetch_page(url, timeout=20):
+    """Загружает страницу через дисковый кэш с условной ревалидацией.
+
+    Если страница проверялась недавно, она отдается с диска без запроса.
+    Иначе отправляется условный запрос (If-None-Match / If-Modified-Since),
+    и на 304 тело берется из кэша. При сетевой ошибке отдается устаревшая копия, если она есть.
+    """
+    body, meta = load_cached_page(url)
+    if body is not None and time.time() - meta.get('checked_at', 0) < HTTP_CACHE_FRESH_SECONDS:
+        print(f"HTTP cache fresh, skipping request: {url}")
+        return body
+
+    headers = dict(REQUEST_HEADERS)
+    if body is not None:
+        if meta.get('etag'): headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'): headers['If-Modified-Since'] = meta['last_modified']
+
+    try:
+        response = requests.get(url, headers=headers, timeout=timeout)
+        if response.status_code == 304 and body is not None:
+            print(f"HTTP cache revalidated (304): {url}")
+            meta['checked_at'] = time.time()
+            _write_cache_meta(_http_cache_paths(url)[1], meta)
+            return body
+        response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        if body is not None:
+            print(f"Fetch failed ({e}), serving stale cached copy: {url}")
+            return body
+        raise
+
+    try:
+        store_cached_page(url, response)
+    except OSError as e:
+        print(f"Could not write HTTP cache for {url}: {e}")
+    return response.content
+
+# --- Параллельная загрузка всех страниц турниров ---
+FETCH_MAX_WORKERS = 8
+MAX_REQUESTS_PER_HOST = 4
+_host_semaphores = {}
+_host_semaphores_lock = threading.Lock()
+
+def _get_host_semaphore(url):
+    host = urlparse(url).netloc
+    with _host_semaphores_lock:
+        if host not in _host_semaphores:
+            _host_semaphores[host] = threading.BoundedSemaphore(MAX_REQUESTS_PER_HOST)
+        return _host_semaphores[host]
+
+def _fetch_page_limited(url):
+    with _get_host_semaphore(url):
+        return fetch_page(url)
+
+def fetch_tournament_pages(page_kinds=("match_history", "picks_and_bans")):
+    """Загружает все пары (турнир, тип страницы) одновременно.
+
+    Возвращает {(tournament_name, page_kind): content}. Если загрузка не удалась,
+    вместо content лежит исключение, чтобы парсер мог показать ошибку по своему турниру.
+    """
+    jobs = {(tournament_name, kind): urls[kind]
+            for tournament_name, urls in TOURNAMENT_URLS.items()
+            for kind in page_kinds if kind in urls}
+    pages = {}
+    if not jobs:
+        return pages
+    with ThreadPoolExecutor(max_workers=min(FETCH_MAX_WORKERS, len(jobs))) as executor:
+        futures = {job: executor.submit(_fetch_page_limited, url) for job, url in jobs.items()}
+        for job, future in futures.items():
+            try:
+                pages[job] = future.result()
+            except requests.exceptions.RequestException as e:
+                pages[job] = e
+    return pages
+
+# Normalize team names
+# --- Реестр названий команд ---
+# Алиасы лежат в team_aliases.yaml; точное совпадение ищется в словаре,
+# а вхождение алиаса в длинное название - одним скомпилированным regex по границам слов
+TEAM_ALIASES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "team_aliases.yaml")
+# Короткие теги ("use", "big", "tog") ищутся только точным совпадением
+MIN_FUZZY_ALIAS_LENGTH = 5
+
+def _clean_team_name(team_name):
+    return " ".join(team_name.lower().replace("logo std", "").split())
+
+def load_team_aliases(path=TEAM_ALIASES_FILE):
+    """{алиас: каноническое имя} из YAML-файла; каноническое имя само тоже считается алиасом."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            teams = (yaml.safe_load(f) or {}).get('teams') or {}
+    except (OSError, yaml.YAMLError) as e:
+        print(f"Could not load team aliases from {path}: {e}")
+        return {}
+    aliases = {}
+    for canonical, names in teams.items():
+        for alias in [canonical] + list(names or []):
+            alias_clean = _clean_team_name(str(alias))
+            if alias_clean in aliases and aliases[alias_clean] != canonical:
+                print(f"Team alias '{alias_clean}' is listed for both '{aliases[alias_clean]}' and '{canonical}'")
+                continue
+            aliases[alias_clean] = canonical
+    return aliases
+
+def _compile_alias_matcher(aliases):
+    fuzzy_aliases = [alias for alias in aliases if len(alias) >= MIN_FUZZY_ALIAS_LENGTH]
+    if not fuzzy_aliases:
+        return None
+    # Длинные алиасы раньше коротких, чтобы результат не зависел от порядка в файле
+    pattern = "|".join(re.escape(alias) for alias in sorted(fuzzy_aliases, key=len, reverse=True))
+    return re.compile(rf"(?<![\w-])(?:{pattern})(?![\w-])")
+
+TEAM_ALIASES = load_team_aliases()
+_TEAM_ALIAS_MATCHER = _compile_alias_matcher(TEAM_ALIASES)
+
+@functools.lru_cache(maxsize=4096)
+def normalize_team_name(team_name):
+    if not team_name or team_name.lower() == "unknown blue" or team_name.lower() == "unknown red":
+        return "unknown"
+
+    team_name_clean = _clean_team_name(team_name)
+
+    normalized_name = TEAM_ALIASES.get(team_name_clean)
+    if normalized_name:
+        return normalized_name
+    match = _TEAM_ALIAS_MATCHER.search(team_name_clean) if _TEAM_ALIAS_MATCHER else None
+    if match:
+        return TEAM_ALIASES[match.group(0)]
+
+    return team_name_clean
+
+# --- Инкрементальный скрейпинг ---
+# Скрейперы превращают строки таблиц в записи об играх (одна запись = одна игра).
+# Состояние хранит по каждой странице ее хэш и записи игр с содержимым их строк, поэтому
+# при обновлении разбираются только новые и исправленные строки, а пропавшие игры удаляются.
+def new_scrape_state():
+    # pages - {турнир: {'hash', 'games': {идентичность игры: (содержимое строки, запись)}, 'frame'}};
+    # errors - сообщения последнего прогона [(уровень, текст)]: скрейпинг идет в фоновом потоке,
+    # где st.error/st.warning не видны, поэтому их показывает страница (см. DatasetSnapshot.errors);
+    # changed_teams - команды добавленных, исправленных, удаленных и сдвинутых игр последнего прогона
+    # (только их представления пересчитываются)
+    return {'frame': None, 'pages': {}, 'errors': [], 'changed_teams': set()}
+
+def _time_key(value):
+    # "2025-01-02" -> (2025, 1, 2), "Week 3" -> (3,): даты и недели сравниваются по числам
+    return tuple(int(number) for number in re.findall(r'\d+', str(value)))
+
+def chronological_positions(rows, time_field):
+    """Позиция каждой строки страницы в хронологическом порядке.
+
+    Страницы могут перечислять игры от новых к старым (это видно по времени первой и последней строки) -
+    тогда позиции идут с конца.
+    """
+    times = [_time_key(row.get(time_field, '')) for row in rows if 'skip' not in row and 'error' not in row]
+    if times and times[0] > times[-1]:
+        return list(range(len(rows) - 1, -1, -1))
+    return list(range(len(rows)))
+
+def identify_rows(rows, time_field):
+    """(row, позиция, идентичность, содержимое) для строк страницы в хронологическом порядке.
+
+    Идентичность игры - (дата/неделя, синие, красные, номер такой игры по времени): правка пиков,
+    банов или победителя в строке меняет содержимое, но не идентичность, поэтому запись игры заменяется.
+    Содержимое - все поля строки, включая победителя. У пропущенных/ошибочных строк идентичность = None.
+    """
+    occurrences = defaultdict(int)
+    result = []
+    for position, row in sorted(zip(chronological_positions(rows, time_field), rows), key=lambda item: item[0]):
+        if 'skip' in row or 'error' in row:
+            result.append((row, position, None, None))
+            continue
+        base = (row.get(time_field, ''), row['blue'], row['red'])
+        occurrences[base] += 1
+        content = tuple((key, tuple(value) if isinstance(value, list) else value)
+                        for key, value in sorted(row.items()) if key not in ('table_index', 'row_index'))
+        result.append((row, position, base + (occurrences[base],), content))
+    return result
+
+def _pad5(champions):
+    champions = list(champions)[:5]
+    while len(champions) < 5: champions.append("N/A")
+    return champions
+
+def _state_frame(state):
+    """Таблица записей всех страниц; пересобирается (из таблиц страниц) только после изменений."""
+    if state['frame'] is None:
+        frames = [page['frame'] for page in state['pages'].values() if len(page['frame'])]
+        state['frame'] = pd.concat(frames, ignore_index=True) if frames else records_to_frame([])
+    return state['frame']
+
+def _record_teams(record):
+    return {record['blue_team'], record['red_team']}
+
+def _report(errors, level, message):
+    print(message)
+    errors.append((level, message))
+
+def _scrape_page_rows(pages, state, kind, label, extract_rows, time_field, build_record):
+    """Общий цикл по страницам турниров: строки измененных страниц -> записи об играх.
+
+    Записи страницы сверяются с ее текущими строками: новые и исправленные игры разбираются заново,
+    пропавшие удаляются, у остальных обновляется позиция. Возвращает число разобранных строк.
+    """
+    parsed = 0
+    errors = state['errors'] = []
+    changed_teams = state['changed_teams'] = set()
+    for tournament_index, (tournament_name, urls) in enumerate(TOURNAMENT_URLS.items()):
+        url = urls[kind]
+        content = pages.get((tournament_name, kind))
+        if content is None:
+            continue
+        if isinstance(content, Exception):
+            _report(errors, 'error', f"{label} Fetch Error for {tournament_name}: {content}")
+            continue
+
+        page_hash = hashlib.sha1(content).hexdigest()
+        page_state = state['pages'].get(tournament_name) or {'hash': None, 'games': {}, 'frame': records_to_frame([])}
+        if page_state['hash'] == page_hash:
+            print(f"{label} page for {tournament_name} unchanged, skipping parse.")
+            continue
+
+        rows = extract_rows(content)
+        if not rows:
+            _report(errors, 'warning', f"No {label} tables found for {tournament_name}")
+            continue
+        print(f"Found {len(rows)} {label} rows for {tournament_name}.")
+        page_complete = True
+        page_games = {}
+
+        for row, position, identity, row_content in identify_rows(rows, time_field):
+            i, table_index = row['row_index'], row['table_index']
+            if 'skip' in row:
+                print(f"Skipping {label} row {i+1}, {row['skip']}")
+                continue
+
+            previous = page_state['games'].get(identity)
+            if previous is not None and previous[0] == row_content:
+                record = previous[1]
+                if record['seq'] != position:
+                    # Игра сдвинулась (строка вставлена или удалена раньше нее) - меняются номера игр в сериях
+                    record = {**record, 'seq': position}
+                page_games[identity] = (row_content, record)
+                continue
+
+            try:
+                if 'error' in row:
+                    raise row['error']
+                blue_team = normalize_team_name(row['blue'])
+                red_team = normalize_team_name(row['red'])
+                if blue_team == "unknown" or red_team == "unknown":
+                    print(f"Skipping {label} row {i+1}: Unknown team (Raw Blue: '{row['blue']}', Raw Red: '{row['red']}')")
+                    continue
+
+                record = build_record(row, blue_team, red_team)
+                record['tournament'] = tournament_name
+                # Хронологическая позиция на странице: по ней считаются номера игр в сериях
+                record['seq'] = position
+                record['tournament_index'] = tournament_index
+                print(f"{label} Row {i+1}: Blue='{blue_team}' Red='{red_team}' Winner Side='{record['winner_side']}'")
+                page_games[identity] = (row_content, record)
+                parsed += 1
+            except Exception as e:
+                page_complete = False
+                _report(errors, 'error', f"Error processing {label} row {i+1} in table {table_index+1}: {e}")
+                print(f"{label} Error details: Row index {i+1}, Table index {table_index+1}, URL: {url}")
+
+        # Записи, которых нет в новом наборе без изменений, - добавленные, исправленные, удаленные или сдвинутые игры
+        kept = {id(record) for _, record in page_state['games'].values()}
+        current = {id(record) for _, record in page_games.values()}
+        page_changed = False
+        for records, other in ((page_state['games'].values(), current), (page_games.values(), kept)):
+            for _, record in records:
+                if id(record) not in other:
+                    changed_teams |= _record_teams(record)
+                    page_changed = True
+
+        # Страница с ошибочными строками будет разобрана снова при следующем обновлении
+        state['pages'][tournament_name] = {
+            'hash': page_hash if page_complete else None,
+            'games': page_games,
+            'frame': records_to_frame(sorted((record for _, record in page_games.values()), key=lambda record: record['seq']))
+                     if page_changed else page_state['frame'],
+        }
+        if page_changed:
+            state['frame'] = None
+    return parsed
+
+def _match_history_record(row, blue_team, red_team):
+    winner_team = normalize_team_name(row['winner'])
+    winner_side = None
+    if winner_team != "unknown":
+        if winner_team == blue_team: winner_side = 'blue'
+        elif winner_team == red_team: winner_side = 'red'
+    record = {'date': row['date'], 'patch': row['patch'], 'blue_team': blue_team, 'red_team': red_team, 'winner_side': winner_side}
+    for side in ('blue', 'red'):
+        # Баны MH в порядке фаз; пики MH - в порядке ролей Top->Sup
+        for n, champ in enumerate(_pad5(row[f'{side}_bans']), start=1):
+            record[f'{side}_ban_{n}'] = champ
+        for role, champ in zip(ROLES, _pad5(row[f'{side}_picks'])):
+            record[f'{side}_{role_column(role)}'] = champ
+    return record
+
+def _draft_record(row, blue_team, red_team):
+    record = {'week': row['week'], 'patch': row['patch'], 'blue_team': blue_team, 'red_team': red_team,
+              'winner_side': row['winner_side'], 'vod_link': row['vod_link']}
+    for side in ('blue', 'red'):
+        # Баны [B1..B5] и пики в порядке драфта [P1..P5]
+        for n, champ in enumerate(_pad5(row[f'{side}_bans']), start=1):
+            record[f'{side}_ban_{n}'] = champ
+        for n, champ in enumerate(_pad5(row[f'{side}_picks']), start=1):
+            record[f'{side}_pick_{n}'] = champ
+    return record
+
+# Fetch match history data for role-based stats and opponent bans
+# pages: результат fetch_tournament_pages(); если не передан, MH страницы загружаются здесь
+# state: состояние прошлого прогона (new_scrape_state()); без него все строки разбираются с нуля
+# Возвращает таблицу игр из Match History (одна строка = одна игра)
+def fetch_match_history_data(pages=None, state=None):
+    print("Fetching Match History Data (for Role/Duo Stats & Opponent Bans)...")
+    if state is None:
+        state = new_scrape_state()
+    if pages is None:
+        pages = fetch_tournament_pages(("match_history",))
+    parsed = _scrape_page_rows(pages, state, "match_history", "MH", extract_match_history_rows, 'date', _match_history_record)
+    print(f"Finished fetching Match History Data ({parsed} new or edited games).")
+    return _state_frame(state)
+
+# Fetch draft data for visual draft display and team's first 3 bans
+# pages: результат fetch_tournament_pages(); если не передан, P/B страницы загружаются здесь
+# state: состояние прошлого прогона (new_scrape_state()); без него все строки разбираются с нуля
+# Возвращает таблицу игр из Picks and Bans (одна строка = одна игра)
+def fetch_draft_data(pages=None, state=None):
+    print("Fetching Draft (Picks/Bans Table) Data (for Draft Display & Team Bans)...")
+    if state is None:
+        state = new_scrape_state()
+    if pages is None:
+        pages = fetch_tournament_pages(("picks_and_bans",))
+    parsed = _scrape_page_rows(pages, state, "picks_and_bans", "P/B", extract_picks_and_bans_rows, 'week', _draft_record)
+    print(f"Finished fetching Draft (Picks/Bans Table) Data ({parsed} new or edited games).")
+    return _state_frame(state)
+
+# Состояние инкрементального скрейпинга живет в модуле, т.е. одно на процесс и переживает перезапуски скрипта
+_scrape_state = {'match_history': new_scrape_state(), 'picks_and_bans': new_scrape_state()}
+_scrape_lock = threading.Lock()
+
+def refresh_tournament_data():
+    """Загружает страницы всех турниров, разбирает только новые и исправленные игры и собирает общую таблицу игр.
+
+    Возвращает (таблица игр, ошибки прогона [(уровень, текст)], команды измененных игр). Без изменений
+    возвращается тот же объект таблицы, что и в прошлый раз.
+    """
+    pages = fetch_tournament_pages()
+    with _scrape_lock:
+        mh_games = fetch_match_history_data(pages, _scrape_state['match_history'])
+        pb_games = fetch_draft_data(pages, _scrape_state['picks_and_bans'])
+        errors = tuple(_scrape_state['match_history']['errors'] + _scrape_state['picks_and_bans']['errors'])
+        changed_teams = _scrape_state['match_history']['changed_teams'] | _scrape_state['picks_and_bans']['changed_teams']
+        cached = _scrape_state.get('games')
+        if cached is not None and cached[0] is mh_games and cached[1] is pb_games:
+            return cached[2], errors, set()
+        # Слияние MH и P/B - одна векторная операция по всему сезону; дорогие представления
+        # команд (статистика, драфты, сводки) пересчитываются только для changed_teams
+        games = build_games_table(mh_games, pb_games)
+        _scrape_state['games'] = (mh_games, pb_games, games)
+    return games, errors, changed_teams
+
+# --- Общий на процесс датасет с фоновым обновлением ---
+# Снимок неизменяем: сессии читают его без блокировок, а обновление подменяет ссылку целиком
+# games - каноническая таблица игр; match_history_data и draft_data - производные представления для страниц,
+# summaries - готовые к отрисовке сводки команд (game_facts.build_team_summary),
+# errors - ошибки и предупреждения последнего скрейпинга [(уровень, текст)] для показа на странице
+DatasetSnapshot = namedtuple('DatasetSnapshot', ['version', 'updated_at', 'games', 'match_history_data', 'draft_data', 'teams', 'summaries', 'errors'])
+
+DATASET_REFRESH_SECONDS = 15 * 60
+# Пока первая загрузка не удалась: повтор через 5, 10, 20... секунд (не реже refresh_seconds)
+DATASET_RETRY_SECONDS = 5
+
+def _collect_teams(games):
+    all_teams = set(games['blue_team'].astype(str)) | set(games['red_team'].astype(str))
+    all_teams.discard("unknown")
+    return tuple(sorted(team for team in all_teams if team))
+
+class SharedDataset:
+    """Один датасет Leaguepedia на все сессии Streamlit.
+
+    Фоновый поток раз в refresh_seconds обновляет данные (инкрементально, через HTTP-кэш)
+    и атомарно подменяет снимок. Сессии получают текущий снимок через get(). Если первая
+    загрузка не удалась, ее повторяют get() и фоновый поток с растущей паузой (retry_seconds * 2^n).
+    """
+    def __init__(self, refresh_seconds=DATASET_REFRESH_SECONDS, retry_seconds=DATASET_RETRY_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self.retry_seconds = retry_seconds
+        self.last_error = None # Текст исключения последнего неудачного обновления
+        self._snapshot = None
+        self._attempts = 0
+        self._failures = 0 # Неудачных обновлений подряд
+        self._retry_at = 0.0
+        self._ready = threading.Event()
+        self._refresh_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread = None
+
+    def get(self, wait=True):
+        """Текущий снимок. До первой загрузки ждет ее завершения (если wait=True).
+
+        Пока снимка нет (первая загрузка упала), вызов повторяет загрузку, когда истекла пауза повтора.
+        """
+        if self._snapshot is None and wait:
+            self.start()
+            self._ready.wait()
+            if self._snapshot is None and time.time() >= self._retry_at:
+                self.refresh()
+        return self._snapshot
+
+    def refresh(self):
+        """Обновляет данные и подменяет снимок. Параллельные вызовы не дублируют скрейпинг."""
+        attempts_before = self._attempts
+        with self._refresh_lock:
+            # Пока ждали блокировку, обновление мог сделать другой поток - тогда его результат и отдаем
+            if self._attempts != attempts_before:
+                return self._snapshot
+            self._attempts += 1
+            try:
+                games, errors, changed_teams = refresh_tournament_data()
+                current = self._snapshot
+                self._failures, self.last_error = 0, None
+                if current is not None and current.games is games:
+                    # Новых игр нет - версия (и все, что к ней привязано) остается прежней
+                    self._snapshot = current._replace(updated_at=time.time(), errors=errors)
+                    return self._snapshot
+                if current is None:
+                    match_history_data, draft_data, summaries = build_team_views(games)
+                else:
+                    # Статистика команды зависит только от ее игр: остальные команды берем из прошлого снимка
+                    # (команда, у которой не осталось игр, пропадает)
+                    changed = build_team_views(games, changed_teams)
+                    match_history_data, draft_data, summaries = (
+                        {**{team: value for team, value in previous.items() if team not in changed_teams}, **update}
+                        for previous, update in zip((current.match_history_data, current.draft_data, current.summaries), changed))
+                self._snapshot = DatasetSnapshot(
+                    version=(current.version if current else 0) + 1,
+                    updated_at=time.time(),
+                    games=games,
+                    match_history_data=match_history_data,
+                    draft_data=draft_data,
+                    teams=_collect_teams(games),
+                    summaries=summaries,
+                    errors=errors,
+                )
+            except Exception as e:
+                print(f"Dataset refresh failed: {e}")
+                self._failures += 1
+                self.last_error = str(e)
+                self._retry_at = time.time() + min(self.retry_seconds * 2 ** (self._failures - 1), self.refresh_seconds)
+            finally:
+                self._ready.set()
+        return self._snapshot
+
+    def start(self):
+        """Запускает фоновый поток обновления (один раз на процесс)."""
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="dataset-refresher", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self.refresh()
+            if self._snapshot is None:
+                time.sleep(max(self._retry_at - time.time(), 0.1))
+            else:
+                time.sleep(self.refresh_seconds)
+
+_shared_dataset = SharedDataset()
+
+def get_shared_dataset():
+    return _shared_dataset
@@ -0,0 +1,256 @@
+"""Локальное зеркало Data Dragon.
+
+Версия патча берется из кэша на диске и обновляется в фоне, так что импорт
+и перезапуски скрипта Streamlit не ждут сеть. Иконки чемпионов скачиваются
+один раз на патч в data/ddragon/<patch>/ (в фоне), уменьшаются до размера
+таблиц и отдаются странице как data URI - браузер не делает отдельный запрос
+к CDN на каждую ячейку.
+"""
+import os
+import base64
+import json
+import time
+import shutil
+import threading
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow не установлен - иконки хранятся в исходном размере
+    Image = None
+
+DDRAGON_URL = "https://ddragon.leagueoflegends.com"
+DDRAGON_DIR = os.path.join("data", "ddragon")
+DDRAGON_TIMEOUT = 10
+ICON_DOWNLOAD_WORKERS = 8
+# Иконки в таблицах 35px; храним в 2x для retina-экранов
+ICON_SIZE = 70
+
+# Версия патча: пока новая не подтверждена Data Dragon, используется прошлая
+DEFAULT_PATCH_VERSION = "14.5.1"
+PATCH_VERSION_FILE = os.path.join(DDRAGON_DIR, "version.json")
+PATCH_VERSION_TTL_SECONDS = 60 * 60
+PATCH_VERSION_TIMEOUT = 3
+# После неудачной проверки следующая попытка - через минуту, а не через TTL
+PATCH_VERSION_RETRY_SECONDS = 60
+# Без обращений к сети: только то, что уже лежит на диске (бенчмарки, работа без интернета)
+DDRAGON_OFFLINE = os.environ.get("DDRAGON_OFFLINE") == "1"
+
+_champion_ids = {} # {patch: {ключ имени: id чемпиона в Data Dragon}}
+_icon_uris = {} # {(patch, id): data URI}
+_mirror_threads = {}
+_mirror_failed_at = {} # {patch: время неудачной загрузки} - повтор не раньше чем через PATCH_VERSION_RETRY_SECONDS
+_mirrored = set() # Патчи, загруженные полностью
+_icon_generation = 0 # Растет, когда загрузка записала на диск новые иконки
+_mirror_lock = threading.Lock()
+_patch_state = {'version': None, 'checked_at': 0.0, 'loaded': False, 'refreshing': False}
+_patch_lock = threading.Lock()
+
+
+def _champion_key(name):
+    return ''.join(ch for ch in str(name).lower() if ch.isalnum())
+
+def _patch_dir(version):
+    return os.path.join(DDRAGON_DIR, version)
+
+def _version_key(version):
+    """"14.10.1" -> (14, 10, 1); None для имен, которые не являются версией."""
+    try:
+        return tuple(int(part) for part in version.split("."))
+    except ValueError:
+        return None
+
+def _icon_path(version, champion_id):
+    return os.path.join(_patch_dir(version), "champion", f"{champion_id}.png")
+
+def _icons_on_disk(version):
+    try:
+        return sum(1 for name in os.listdir(os.path.dirname(_icon_path(version, ""))) if name.endswith(".png"))
+    except OSError:
+        return 0
+
+def _write_atomic(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+def _shrink_icon(content):
+    if Image is None:
+        return content
+    try:
+        with Image.open(BytesIO(content)) as image:
+            out = BytesIO()
+            image.resize((ICON_SIZE, ICON_SIZE), Image.LANCZOS).save(out, format="PNG", optimize=True)
+            return out.getvalue()
+    except Exception as e:
+        print(f"Could not resize champion icon: {e}")
+        return content
+
+def load_champion_ids(version):
+    """{ключ имени: id} из champion.json патча ("Lee Sin" и "LeeSin" -> "LeeSin"). Пустой словарь, если файла еще нет."""
+    ids = _champion_ids.get(version)
+    if ids is not None:
+        return ids
+    path = os.path.join(_patch_dir(version), "champion.json")
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            champions = json.load(f).get("data", {})
+    except (OSError, ValueError) as e:
+        print(f"Could not read {path}: {e}")
+        return {}
+    ids = {}
+    for champion in champions.values():
+        ids[_champion_key(champion["name"])] = champion["id"]
+        ids[_champion_key(champion["id"])] = champion["id"]
+    _champion_ids[version] = ids
+    return ids
+
+def _download_icon(version, champion_id):
+    path = _icon_path(version, champion_id)
+    if os.path.exists(path):
+        return True
+    try:
+        response = requests.get(f"{DDRAGON_URL}/cdn/{version}/img/champion/{champion_id}.png", timeout=DDRAGON_TIMEOUT)
+        response.raise_for_status()
+        _write_atomic(path, _shrink_icon(response.content))
+        return True
+    except Exception as e:
+        print(f"Icon download failed for {champion_id} ({version}): {e}")
+        return False
+
+def mirror_champion_icons(version):
+    """Скачивает champion.json и недостающие иконки патча; после полной загрузки удаляет патчи старше него."""
+    champion_json = os.path.join(_patch_dir(version), "champion.json")
+    if not os.path.exists(champion_json):
+        try:
+            response = requests.get(f"{DDRAGON_URL}/cdn/{version}/data/en_US/champion.json", timeout=DDRAGON_TIMEOUT)
+            response.raise_for_status()
+            _write_atomic(champion_json, response.content)
+        except Exception as e:
+            print(f"Could not download champion list for {version}: {e}")
+            return False
+    champion_ids = sorted(set(load_champion_ids(version).values()))
+    with ThreadPoolExecutor(max_workers=ICON_DOWNLOAD_WORKERS) as executor:
+        downloaded = list(executor.map(lambda champion_id: _download_icon(version, champion_id), champion_ids))
+    print(f"Data Dragon {version}: {sum(downloaded)}/{len(champion_ids)} champion icons on disk.")
+    if not all(downloaded):
+        return False
+    # Более новые патчи не трогаем: их мог уже загрузить другой поток или процесс
+    for name in os.listdir(DDRAGON_DIR):
+        name_key = _version_key(name)
+        if name_key is not None and name_key < _version_key(version) and os.path.isdir(os.path.join(DDRAGON_DIR, name)):
+            shutil.rmtree(os.path.join(DDRAGON_DIR, name), ignore_errors=True)
+    return True
+
+def _run_mirror(version):
+    global _icon_generation
+    icons_before = _icons_on_disk(version)
+    try:
+        complete = mirror_champion_icons(version)
+    except Exception as e:
+        print(f"Data Dragon mirror for {version} failed: {e}")
+        complete = False
+    with _mirror_lock:
+        if complete:
+            _mirrored.add(version)
+        else:
+            _mirror_failed_at[version] = time.time()
+        # Неудачная попытка без новых иконок (нет доступа к CDN) не сбрасывает кэши HTML
+        if _icons_on_disk(version) > icons_before:
+            _icon_generation += 1
+
+def icon_generation():
+    """Поколение иконок на диске - часть ключей кэшей HTML с иконками (иначе в них остаются заглушки)."""
+    return _icon_generation
+
+def _is_confirmed_version(version):
+    # Подтвержденная версия - из versions.json (сейчас или в прошлом запуске, через кэш на диске);
+    # DEFAULT_PATCH_VERSION до первой проверки не загружается
+    with _patch_lock:
+        return version == _patch_state['version']
+
+def start_icon_mirror(version):
+    """Запускает фоновую загрузку иконок подтвержденного патча.
+
+    Один поток на патч; после неудачной загрузки повтор разрешен через PATCH_VERSION_RETRY_SECONDS.
+    """
+    if DDRAGON_OFFLINE or not _is_confirmed_version(version):
+        return
+    with _mirror_lock:
+        thread = _mirror_threads.get(version)
+        if version in _mirrored or (thread is not None and thread.is_alive()):
+            return
+        if time.time() - _mirror_failed_at.get(version, 0.0) < PATCH_VERSION_RETRY_SECONDS:
+            return
+        thread = threading.Thread(target=_run_mirror, args=(version,), name=f"ddragon-{version}", daemon=True)
+        _mirror_threads[version] = thread
+        thread.start()
+
+def champion_icon_uri(champion, version, fallback_id=None):
+    """data URI иконки чемпиона с диска или None, если иконки еще нет (тогда запускается загрузка патча)."""
+    champion_id = load_champion_ids(version).get(_champion_key(champion), fallback_id)
+    if not champion_id:
+        return None
+    uri = _icon_uris.get((version, champion_id))
+    if uri is not None:
+        return uri
+    path = _icon_path(version, champion_id)
+    if not os.path.exists(path):
+        start_icon_mirror(version)
+        return None
+    with open(path, "rb") as f:
+        uri = "data:image/png;base64," + base64.b64encode(f.read()).decode("ascii")
+    _icon_uris[(version, champion_id)] = uri
+    return uri
+
+def _load_patch_version_cache():
+    try:
+        with open(PATCH_VERSION_FILE, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        return cached.get("version"), float(cached.get("checked_at", 0))
+    except (OSError, ValueError):
+        return None, 0.0
+
+def refresh_patch_version():
+    """Запрашивает последнюю версию у Data Dragon (короткий таймаут) и сохраняет ее в кэш."""
+    try:
+        response = requests.get(f"{DDRAGON_URL}/api/versions.json", timeout=PATCH_VERSION_TIMEOUT)
+        response.raise_for_status()
+        version = response.json()[0]
+        checked_at = time.time()
+        _write_atomic(PATCH_VERSION_FILE, json.dumps({"version": version, "checked_at": checked_at}).encode("utf-8"))
+        with _patch_lock:
+            if version != _patch_state['version']:
+                print(f"Data Dragon patch version: {version}")
+            _patch_state['version'], _patch_state['checked_at'] = version, checked_at
+        start_icon_mirror(version)
+    except Exception as e:
+        # Сеть недоступна - остаемся на прошлой версии до следующей проверки
+        print(f"Could not refresh patch version: {e}")
+        with _patch_lock:
+            _patch_state['checked_at'] = time.time() - PATCH_VERSION_TTL_SECONDS + PATCH_VERSION_RETRY_SECONDS
+    finally:
+        with _patch_lock:
+            _patch_state['refreshing'] = False
+
+def get_patch_version():
+    """Текущая версия патча без ожидания сети; устаревшая версия обновляется в фоновом потоке."""
+    first_load = False
+    with _patch_lock:
+        if not _patch_state['loaded']:
+            _patch_state['loaded'] = first_load = True
+            _patch_state['version'], _patch_state['checked_at'] = _load_patch_version_cache()
+        version = _patch_state['version']
+        stale = time.time() - _patch_state['checked_at'] > PATCH_VERSION_TTL_SECONDS
+        if stale and not _patch_state['refreshing'] and not DDRAGON_OFFLINE:
+            _patch_state['refreshing'] = True
+            threading.Thread(target=refresh_patch_version, name="ddragon-version", daemon=True).start()
+    if first_load and version:
+        start_icon_mirror(version)
+    return version or DEFAULT_PATCH_VERSION
@@ -0,0 +1,318 @@
+"""Таблица игр (одна строка = одна игра) - каноническая модель данных Leaguepedia.
+
+Match History дает пики по ролям, дату и победителя; Picks and Bans - порядок
+драфта, баны и VOD. Обе страницы сводятся в одну таблицу по ключу игры
+(турнир, команды и состав пиков), а статистика по ролям, банам, дуо и
+драфтам считается группировками по этой таблице.
+"""
+import bisect
+import itertools
+from collections import defaultdict
+import pandas as pd
+
+ROLES = ['Top', 'Jungle', 'Mid', 'ADC', 'Support'] # Порядок ролей в MH таблице
+SIDES = ('blue', 'red')
+# Пары, которые секция Duo Picks показывает по умолчанию
+DUO_PAIRS = [('Top', 'Jungle'), ('Jungle', 'Mid'), ('Jungle', 'Support'), ('ADC', 'Support')]
+# Наборы ролей в индексе дуо: все 10 пар и нижняя линия вместе с лесником
+DUO_ROLE_SETS = list(itertools.combinations(ROLES, 2)) + [('Jungle', 'ADC', 'Support')]
+
+def role_column(role):
+    return role.lower()
+
+BAN_COLUMNS = {side: [f'{side}_ban_{n}' for n in range(1, 6)] for side in SIDES}
+PICK_COLUMNS = {side: [f'{side}_pick_{n}' for n in range(1, 6)] for side in SIDES}
+ROLE_COLUMNS = {side: [f'{side}_{role_column(role)}' for role in ROLES] for side in SIDES}
+
+_COMMON_COLUMNS = ['tournament', 'tournament_index', 'seq', 'patch', 'blue_team', 'red_team', 'winner_side'] + BAN_COLUMNS['blue'] + BAN_COLUMNS['red']
+MH_COLUMNS = _COMMON_COLUMNS + ['date'] + ROLE_COLUMNS['blue'] + ROLE_COLUMNS['red']
+PB_COLUMNS = _COMMON_COLUMNS + ['week', 'vod_link'] + PICK_COLUMNS['blue'] + PICK_COLUMNS['red']
+
+GAME_COLUMNS = (['tournament', 'date', 'week', 'patch', 'blue_team', 'red_team', 'winner_side']
+                + BAN_COLUMNS['blue'] + BAN_COLUMNS['red'] + PICK_COLUMNS['blue'] + PICK_COLUMNS['red']
+                + ROLE_COLUMNS['blue'] + ROLE_COLUMNS['red']
+                + ['vod_link', 'match_number', 'blue_series_wins', 'red_series_wins', 'has_roles', 'has_draft', 'seq'])
+CATEGORY_COLUMNS = (['tournament', 'patch', 'blue_team', 'red_team', 'winner_side']
+                    + BAN_COLUMNS['blue'] + BAN_COLUMNS['red'] + PICK_COLUMNS['blue'] + PICK_COLUMNS['red']
+                    + ROLE_COLUMNS['blue'] + ROLE_COLUMNS['red'])
+
+
+def records_to_frame(records):
+    """Записи скрейпера -> DataFrame (пустой список дает пустую таблицу)."""
+    return pd.DataFrame.from_records(records) if records else pd.DataFrame()
+
+def _champion_key(champ):
+    # Имена из title и из data-champion пишутся по-разному ("Lee Sin" / "Leesin") - сравниваем без регистра и знаков
+    return ''.join(ch for ch in str(champ).lower() if ch.isalnum())
+
+def _game_keys(frame, pick_columns):
+    """Ключ игры: турнир, команды и отсортированные пики каждой стороны + номер повтора такого ключа."""
+    keys = pd.Series([
+        "|".join((tournament, blue, red,
+                  ",".join(sorted(_champion_key(c) for c in blue_picks)),
+                  ",".join(sorted(_champion_key(c) for c in red_picks))))
+        for tournament, blue, red, blue_picks, red_picks in zip(
+            frame['tournament'], frame['blue_team'], frame['red_team'],
+            frame[pick_columns['blue']].values.tolist(), frame[pick_columns['red']].values.tolist())
+    ], index=frame.index, dtype=object)
+    return keys + "#" + keys.groupby(keys).cumcount().astype(str)
+
+def build_games_table(mh_games, pb_games):
+    """Сводит игры из Match History и Picks and Bans в одну таблицу (outer join по ключу игры).
+
+    seq входных таблиц - хронологическая позиция игры на странице турнира; в результате seq -
+    сквозной номер игры по (турнир, позиция).
+    """
+    # Порядок строк входа (а с ним номера повторов ключей) не зависит от порядка, в котором записи копились
+    mh = mh_games.reindex(columns=MH_COLUMNS).sort_values(['tournament_index', 'seq'], kind='stable')
+    pb = pb_games.reindex(columns=PB_COLUMNS).sort_values(['tournament_index', 'seq'], kind='stable')
+    mh['game_key'] = _game_keys(mh, ROLE_COLUMNS) if len(mh) else pd.Series(dtype=object)
+    pb['game_key'] = _game_keys(pb, PICK_COLUMNS) if len(pb) else pd.Series(dtype=object)
+    mh['has_roles'] = True
+    pb['has_draft'] = True
+
+    games = pd.merge(pb, mh, on='game_key', how='outer', suffixes=('', '_mh'), sort=False)
+    # Общие колонки берем из P/B, а если игры там нет - из MH
+    for column in _COMMON_COLUMNS:
+        games[column] = games[column].combine_first(games[f'{column}_mh'])
+    games = games.drop(columns=[f'{column}_mh' for column in _COMMON_COLUMNS])
+    games['has_roles'] = games['has_roles'].fillna(False).astype(bool)
+    games['has_draft'] = games['has_draft'].fillna(False).astype(bool)
+    games = games.sort_values(['tournament_index', 'seq'], kind='stable').reset_index(drop=True)
+    # Позиции разных турниров пересекаются, а представления команд сортируют игры только по seq
+    games['seq'] = range(len(games))
+
+    # Номер игры и счет "серии" (все игры пары команд) по порядку появления на P/B странице.
+    # Победы считаются по командам, а не по сторонам: команды меняются сторонами между играми;
+    # blue_series_wins/red_series_wins - победы команды, игравшей за синих/красных в этой игре
+    drafts = games[games['has_draft']]
+    # object, а не dtype колонок: у пустых таблиц команды - float64, и "+" со строкой падает
+    blue, red = drafts['blue_team'].astype(object), drafts['red_team'].astype(object)
+    first, second = blue.where(blue < red, red), red.where(blue < red, blue)
+    pair = first + "|" + second
+    winner = blue.where(drafts['winner_side'] == 'blue', red.where(drafts['winner_side'] == 'red'))
+    first_wins = (winner == first).astype(int).groupby(pair).cumsum()
+    second_wins = (winner == second).astype(int).groupby(pair).cumsum()
+    games['match_number'] = (drafts.groupby(pair).cumcount() + 1).reindex(games.index)
+    games['blue_series_wins'] = first_wins.where(blue == first, second_wins).reindex(games.index)
+    games['red_series_wins'] = second_wins.where(blue == first, first_wins).reindex(games.index)
+
+    games = games.reindex(columns=GAME_COLUMNS)
+    for column in CATEGORY_COLUMNS:
+        games[column] = games[column].astype('category')
+    return games
+
+def team_perspective(games, game_columns=()):
+    """Две строки на игру - с точки зрения синей и красной команды (team/opponent/side/win, свои и чужие баны/пики).
+
+    game_columns: колонки игры, которые копируются в обе строки как есть.
+    """
+    frames = []
+    for side, opp in (('blue', 'red'), ('red', 'blue')):
+        frame = pd.DataFrame({
+            'team': games[f'{side}_team'].astype(object),
+            'opponent': games[f'{opp}_team'].astype(object),
+            'side': side,
+            'side_order': 0 if side == 'blue' else 1,
+            'win': (games['winner_side'] == side).to_numpy(),
+            'winner_side': games['winner_side'].astype(object),
+            'has_roles': games['has_roles'], 'has_draft': games['has_draft'], 'seq': games['seq'],
+        }, index=games.index)
+        for n in range(5):
+            frame[f'ban_{n + 1}'] = games[BAN_COLUMNS[side][n]].astype(object)
+            frame[f'opp_ban_{n + 1}'] = games[BAN_COLUMNS[opp][n]].astype(object)
+            frame[f'pick_{n + 1}'] = games[PICK_COLUMNS[side][n]].astype(object)
+            frame[f'opp_pick_{n + 1}'] = games[PICK_COLUMNS[opp][n]].astype(object)
+        for role in ROLES:
+            frame[role] = games[f'{side}_{role_column(role)}'].astype(object)
+        for column in game_columns:
+            frame[column] = games[column]
+        frames.append(frame)
+    if not frames[0].size:
+        return frames[0]
+    return pd.concat(frames, ignore_index=True)
+
+def role_stats(tg):
+    """{team: {role: {champ: {'games', 'wins'}}}} по играм из Match History."""
+    result = {}
+    mh_rows = tg[tg['has_roles']]
+    for role in ROLES:
+        agg = mh_rows.groupby(['team', role], sort=False)['win'].agg(['size', 'sum'])
+        for (team, champ), games_count, wins in zip(agg.index, agg['size'], agg['sum']):
+            result.setdefault(team, {}).setdefault(role, {})[champ] = {'games': int(games_count), 'wins': int(wins)}
+    return result
+
+def first3_ban_counts(tg, prefix):
+    """{(team, side): {champ: count}} для первых трех банов (prefix='ban_' - свои, 'opp_ban_' - оппонента)."""
+    melted = tg.melt(id_vars=['team', 'side'], value_vars=[f'{prefix}{n}' for n in (1, 2, 3)], value_name='champ')
+    melted = melted[melted['champ'].notna() & (melted['champ'] != "N/A")]
+    counts = melted.groupby(['team', 'side', 'champ'], sort=False).size()
+    result = {}
+    for (team, side, champ), count in counts.items():
+        result.setdefault((team, side), {})[champ] = int(count)
+    return result
+
+def _role_set_key(roles):
+    return tuple(sorted(roles, key=ROLES.index))
+
+class DuoIndex:
+    """Сочетания чемпионов команды, разбитые по наборам ролей (пары, тройки).
+
+    Каждая часть - [(чемпионы в порядке ROLES, games, wins)] по убыванию игр, поэтому запрос
+    к набору ролей с порогом игр - поиск части и бинарный поиск границы, без перебора остальных.
+    """
+    def __init__(self, partitions=None):
+        self._partitions = partitions or {} # {роли в порядке ROLES: строки}
+        # Игры с минусом по возрастанию - для bisect по порогу min_games
+        self._negated_games = {roles: [-games for _, games, _ in rows] for roles, rows in self._partitions.items()}
+
+    def role_sets(self):
+        return list(self._partitions)
+
+    def rows(self, roles, min_games=1):
+        """[(чемпионы в порядке roles, games, wins)] с games >= min_games, по убыванию игр."""
+        key = _role_set_key(roles)
+        rows = self._partitions.get(key, [])
+        end = bisect.bisect_right(self._negated_games.get(key, []), -min_games)
+        order = [key.index(role) for role in roles]
+        if order == list(range(len(key))):
+            return rows[:end]
+        return [(tuple(champions[i] for i in order), games, wins) for champions, games, wins in rows[:end]]
+
+def duo_stats(tg, role_sets=DUO_ROLE_SETS):
+    """{team: DuoIndex} по играм из Match History - для каждого набора ролей из role_sets."""
+    partitions = defaultdict(dict)
+    mh_rows = tg[tg['has_roles']]
+    for roles in role_sets:
+        key = list(_role_set_key(roles))
+        mask = pd.Series(True, index=mh_rows.index)
+        for role in key:
+            mask &= mh_rows[role].notna() & (mh_rows[role] != "N/A")
+        agg = mh_rows[mask].groupby(['team'] + key, sort=False)['win'].agg(['size', 'sum'])
+        # Стабильная сортировка: при равном числе игр порядок - как игры встречались в таблице
+        agg = agg.sort_values('size', ascending=False, kind='stable')
+        for (team, *champions), games_count, wins in zip(agg.index, agg['size'], agg['sum']):
+            partitions[team].setdefault(tuple(key), []).append((tuple(champions), int(games_count), int(wins)))
+    return {team: DuoIndex(team_partitions) for team, team_partitions in partitions.items()}
+
+def build_team_data(games):
+    """Представление для секций Picks/Bans/Duo Picks: {team: {'Top': ..., 'OpponentBlueBansFirst3': ..., 'DuoPicks': DuoIndex, 'MatchResults': [...]}}."""
+    tg = team_perspective(games)
+    if tg.empty:
+        return {}
+    roles_by_team = role_stats(tg)
+    opponent_bans = first3_ban_counts(tg, 'opp_ban_')
+    duos_by_team = duo_stats(tg)
+    mh_rows = tg[tg['has_roles']].sort_values(['seq', 'side_order'], kind='stable')
+    results_by_team = {team: group[['opponent', 'side', 'win']].to_dict('records') for team, group in mh_rows.groupby('team', sort=False)}
+
+    team_data = {}
+    for team in roles_by_team:
+        stats = {role: roles_by_team[team].get(role, {}) for role in ROLES}
+        # Когда команда играла СИНЕЙ, ее оппонент банил за красных, и наоборот
+        stats['OpponentRedBansFirst3'] = opponent_bans.get((team, 'blue'), {})
+        stats['OpponentBlueBansFirst3'] = opponent_bans.get((team, 'red'), {})
+        stats['DuoPicks'] = duos_by_team.get(team) or DuoIndex()
+        stats['MatchResults'] = results_by_team.get(team, [])
+        team_data[team] = stats
+    return team_data
+
+def build_team_drafts(games):
+    """Представление для секций Drafts/Bans: {team: [драфт с точки зрения команды, ...]} в порядке игр."""
+    draft_games = games[games['has_draft']]
+    tg = team_perspective(draft_games, ['blue_team', 'red_team', 'match_number', 'blue_series_wins', 'red_series_wins', 'vod_link', 'tournament'])
+    if tg.empty:
+        return {}
+    tg = tg.sort_values(['seq', 'side_order'], kind='stable')
+    blue_team = tg['blue_team'].astype(object)
+    red_team = tg['red_team'].astype(object)
+    drafts = pd.DataFrame({
+        'team': tg['team'],
+        'opponent': tg['opponent'],
+        'side': tg['side'], # Сторона этой команды
+        'team_bans': tg[[f'ban_{n}' for n in range(1, 6)]].values.tolist(),
+        'opponent_bans': tg[[f'opp_ban_{n}' for n in range(1, 6)]].values.tolist(),
+        'team_picks': tg[[f'pick_{n}' for n in range(1, 6)]].values.tolist(),
+        'opponent_picks': tg[[f'opp_pick_{n}' for n in range(1, 6)]].values.tolist(),
+        'winner_side': tg['winner_side'],
+        # Счет серии после этой игры: победы команды и оппонента
+        'team_wins': tg['blue_series_wins'].where(tg['side'] == 'blue', tg['red_series_wins']).astype(int),
+        'opponent_wins': tg['red_series_wins'].where(tg['side'] == 'blue', tg['blue_series_wins']).astype(int),
+        'match_key': [tuple(sorted(pair)) for pair in zip(blue_team, red_team)],
+        'match_number': tg['match_number'].astype(int),
+        'vod_link': tg['vod_link'].astype(object),
+        'tournament': tg['tournament'].astype(object),
+        'absolute_blue_team': blue_team,
+        'absolute_red_team': red_team,
+    }, index=tg.index)
+    return {team: group.drop(columns='team').to_dict('records') for team, group in drafts.groupby('team', sort=False)}
+
+# --- Готовые к отрисовке сводки команд ---
+# Строятся один раз на снимок датасета (после скрейпинга), поэтому переключение команды -
+# поиск по словарю, без сортировок и пересчета банов/дуо/серий на каждом перезапуске страницы
+
+def sorted_role_rows(role_data):
+    """{champ: {'games', 'wins'}} -> [(champ, games, wins)] по убыванию игр (без чемпионов с 0 игр)."""
+    ranked = sorted(role_data.items(), key=lambda item: item[1].get('games', 0), reverse=True)
+    return [(champ, data.get('games', 0), data.get('wins', 0)) for champ, data in ranked if data.get('games', 0) > 0]
+
+def sorted_ban_rows(ban_counts):
+    """{champ: count} -> [(champ, count)] по убыванию количества (без "N/A")."""
+    return [(champ, count) for champ, count in sorted(ban_counts.items(), key=lambda item: item[1], reverse=True) if champ != "N/A"]
+
+def group_series(draft_data_list):
+    """Драфты команды -> [(match_key, [драфты серии по номеру игры])] в порядке первой игры серии."""
+    drafts_by_match = defaultdict(list)
+    for draft in draft_data_list:
+        match_key = draft.get('match_key')
+        if match_key: drafts_by_match[match_key].append(draft)
+    sorted_match_keys = sorted(drafts_by_match.keys(), key=lambda k: min(d.get('match_number', float('inf')) for d in drafts_by_match[k]))
+    return [(match_key, sorted(drafts_by_match[match_key], key=lambda d: d.get('match_number', 0))) for match_key in sorted_match_keys]
+
+def build_team_summary(stats, drafts, team_bans):
+    """Сводка команды для страницы: строки таблиц Picks/Bans/Duo Picks и серии драфтов.
+
+    team_bans: {side: {champ: count}} - первые 3 бана команды по драфтам (first3_ban_counts).
+
+    Роли и таблицы банов без данных отсутствуют (как и в исходных словарях).
+    {'roles': {role: [(champ, games, wins)]},
+     'bans': {'team_blue'|'team_red'|'opponent_red'|'opponent_blue': [(champ, count)]},
+     'duos': DuoIndex (уже разбит по наборам ролей и отсортирован),
+     'series': [(match_key, [драфт, ...])]}
+    """
+    ban_counts = {
+        'team_blue': team_bans.get('blue', {}),
+        'team_red': team_bans.get('red', {}),
+        # Когда команда играла синей, оппонент банил за красных, и наоборот
+        'opponent_red': stats.get('OpponentRedBansFirst3', {}),
+        'opponent_blue': stats.get('OpponentBlueBansFirst3', {}),
+    }
+    return {
+        'roles': {role: sorted_role_rows(stats[role]) for role in ROLES if stats.get(role)},
+        'bans': {name: sorted_ban_rows(counts) for name, counts in ban_counts.items() if counts},
+        'duos': stats.get('DuoPicks') or DuoIndex(),
+        'series': group_series(drafts),
+    }
+
+def build_team_summaries(games, team_data, team_drafts):
+    """{team: сводка} для всех команд из build_team_data и build_team_drafts по той же таблице игр."""
+    # Свои баны - по играм с драфтом (P/B), как и секция Drafts
+    team_bans = first3_ban_counts(team_perspective(games[games['has_draft']]), 'ban_')
+    return {team: build_team_summary(team_data.get(team, {}), team_drafts.get(team, []),
+                                     {side: team_bans.get((team, side), {}) for side in ('blue', 'red')})
+            for team in set(team_data) | set(team_drafts)}
+
+def build_team_views(games, teams=None):
+    """(build_team_data, build_team_drafts, build_team_summaries) по таблице игр.
+
+    teams: пересчитать только эти команды - по их играм; результат содержит только их.
+    """
+    if teams is not None:
+        teams = set(teams)
+        games = games[games['blue_team'].isin(teams) | games['red_team'].isin(teams)]
+    team_data = build_team_data(games)
+    team_drafts = build_team_drafts(games)
+    if teams is not None:
+        team_data = {team: stats for team, stats in team_data.items() if team in teams}
+        team_drafts = {team: drafts for team, drafts in team_drafts.items() if team in teams}
+    return team_data, team_drafts, build_team_summaries(games, team_data, team_drafts)
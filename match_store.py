@@ -0,0 +1,126 @@
+"""Локальное хранилище полных ответов match-v5.
+
+Каждый матч хранится один раз (ключ - ID матча) сжатым zlib JSON в SQLite
+(data/riot/matches.sqlite); записи только добавляются. Из него можно заново
+посчитать любые производные таблицы без запросов к Riot API.
+"""
+import os
+import json
+import time
+import zlib
+import asyncio
+import sqlite3
+import threading
+
+MATCH_STORE_FILE = os.path.join("data", "riot", "matches.sqlite")
+MATCH_COMPRESSION_LEVEL = 6
+
+
+class MatchStore:
+    def __init__(self, path=MATCH_STORE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            # Одно соединение на процесс (под блокировкой): запись редкая, чтения короткие
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS matches ("
+                " match_id TEXT PRIMARY KEY,"
+                " game_creation INTEGER,"
+                " stored_at REAL NOT NULL,"
+                " payload BLOB NOT NULL)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS matches_game_creation ON matches (game_creation)")
+        return self._conn
+
+    def put(self, match_id, match_data):
+        """Сохраняет матч, если его еще нет (повторная запись ничего не меняет)."""
+        payload = zlib.compress(json.dumps(match_data, separators=(",", ":")).encode("utf-8"), MATCH_COMPRESSION_LEVEL)
+        game_creation = match_data.get('info', {}).get('gameCreation')
+        with self._lock:
+            conn = self._connect()
+            conn.execute("INSERT OR IGNORE INTO matches (match_id, game_creation, stored_at, payload) VALUES (?, ?, ?, ?)",
+                         (match_id, game_creation, time.time(), payload))
+            conn.commit()
+
+    def get(self, match_id):
+        with self._lock:
+            row = self._connect().execute("SELECT payload FROM matches WHERE match_id = ?", (match_id,)).fetchone()
+        return json.loads(zlib.decompress(row[0])) if row else None
+
+    def stored_ids(self, match_ids):
+        """Какие из match_ids уже есть в хранилище."""
+        match_ids = list(match_ids)
+        found = set()
+        with self._lock:
+            conn = self._connect()
+            for i in range(0, len(match_ids), 500):
+                chunk = match_ids[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                found.update(row[0] for row in conn.execute(f"SELECT match_id FROM matches WHERE match_id IN ({placeholders})", chunk))
+        return found
+
+    def iter_matches(self, since_ms=None):
+        """(match_id, ответ match-v5) по возрастанию времени игры - для пересчета производных таблиц офлайн."""
+        query = "SELECT match_id, payload FROM matches"
+        params = ()
+        if since_ms is not None:
+            query += " WHERE game_creation >= ?"
+            params = (since_ms,)
+        with self._lock:
+            rows = self._connect().execute(query + " ORDER BY game_creation", params).fetchall()
+        for match_id, payload in rows:
+            yield match_id, json.loads(zlib.decompress(payload))
+
+    def count(self):
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM matches").fetchone()[0]
+
+_match_store = None
+_match_store_lock = threading.Lock()
+
+def get_match_store():
+    global _match_store
+    with _match_store_lock:
+        if _match_store is None:
+            _match_store = MatchStore()
+        return _match_store
+
+class MatchFetcher:
+    """Матчи для синхронизации: сначала из хранилища, иначе из Riot API (с сохранением).
+
+    Один экземпляр на синхронизацию: матч, общий для нескольких игроков, запрашивается один раз,
+    даже если аккаунты синхронизируются одновременно.
+    """
+    def __init__(self, client, store=None):
+        self.client = client
+        self.store = store or get_match_store()
+        self._in_flight = {}
+        self.fetched = 0
+        self.from_store = 0
+
+    async def get(self, match_id):
+        task = self._in_flight.get(match_id)
+        if task is None:
+            task = asyncio.ensure_future(self._load(match_id))
+            self._in_flight[match_id] = task
+        return await task
+
+    async def _load(self, match_id):
+        try:
+            match_data = await asyncio.to_thread(self.store.get, match_id)
+            if match_data is not None:
+                self.from_store += 1
+                return match_data
+            match_data = await self.client.get_match(match_id)
+            if match_data is not None:
+                self.fetched += 1
+                await asyncio.to_thread(self.store.put, match_id, match_data)
+            return match_data
+        finally:
+            self._in_flight.pop(match_id, None)
@@ -0,0 +1,187 @@
+"""HTML-таблицы секций страниц.
+
+Функции возвращают готовый HTML (или None, если показывать нечего) и не
+вызывают Streamlit, поэтому их можно прогонять в бенчмарках без приложения.
+"""
+import functools
+import threading
+from html import escape
+import pandas as pd
+from ddragon import champion_icon_uri, get_patch_version, icon_generation
+
+
+def normalize_champion_name(champ):
+    if champ == "N/A":
+        return "N/A"
+    champion_exceptions = {
+        "Nunu & Willump": "Nunu",
+        "Xin Zhao": "XinZhao",
+        "Miss Fortune": "MissFortune",
+        "Kai'Sa": "Kaisa",
+        "Kha'Zix": "Khazix",
+        "LeBlanc": "Leblanc",
+        "Wukong": "MonkeyKing",
+        "Cho'Gath": "Chogath",
+        "Jarvan IV": "JarvanIV",
+        "Ivern": "Ivern",
+        "K'Sante": "KSante",
+        "Renata Glasc": "Renata"
+    }
+    champ_clean = champ.strip().lower()
+    for full_name, normalized_name in champion_exceptions.items():
+        if champ_clean == full_name.lower() or champ_clean.replace(" ", "").replace("&", "").replace("'", "") == full_name.lower().replace(" ", "").replace("&", "").replace("'", ""):
+            return normalized_name
+    champ_normalized = champ.replace(" ", "").replace("'", "").replace(".", "").replace("&", "").replace("-", "")
+    return ''.join(word.capitalize() for word in champ_normalized.split())
+
+def get_champion_icon(champion):
+    if champion == "N/A":
+        return "N/A"
+    # Версия патча из кэша ddragon (не ждет сеть; новая версия подтягивается в фоне)
+    patch_version = get_patch_version()
+    normalized_champ = normalize_champion_name(champion)
+    icon_url = champion_icon_uri(champion, patch_version, fallback_id=normalized_champ) or \
+               f"https://ddragon.leagueoflegends.com/cdn/{patch_version}/img/champion/{normalized_champ}.png"
+    return f'<img src="{icon_url}" width="35" height="35" style="vertical-align: middle;">'
+
+def color_win_rate(value):
+    if 0 <= value < 50:
+        return f'<span style="color:rgb(255, 251, 251)">{value:.2f}</span>'
+    elif 50 <= value <= 53:
+        return f'<span style="color:rgb(204, 204, 31)">{value:.2f}</span>'
+    else:
+        return f'<span style="color:rgb(245, 26, 11)">{value:.2f}</span>'
+
+
+def role_rows_table_html(rows):
+    """Пики роли [(champ, games, wins)] (уже по убыванию игр, см. game_facts.sorted_role_rows) -> таблица."""
+    if not rows:
+        return None
+    df = pd.DataFrame([{
+        'Icon': get_champion_icon(champ),
+        'Champion': champ,
+        'Matches': games,
+        'Win Rate (%)': wins / games * 100
+    } for champ, games, wins in rows])
+    # Применяем цветовую раскраску к Win Rate
+    df['Win Rate (%)'] = df['Win Rate (%)'].apply(color_win_rate)
+    # Убираем пустую колонку индекса при конвертации в HTML
+    return df.to_html(escape=False, index=False, classes='styled-table small-table')
+
+def ban_rows_table_html(rows):
+    """Баны [(champ, count)] (уже по убыванию количества) -> таблица."""
+    if not rows:
+        return None
+    bans_stats = [{'Icon': get_champion_icon(champ), 'Champion': champ, 'Count': count} for champ, count in rows]
+    return pd.DataFrame(bans_stats).to_html(escape=False, index=False, classes='styled-table small-table')
+
+def duo_rows_table_html(rows, roles):
+    """Сочетание ролей [(чемпионы в порядке roles, games, wins)] (уже по убыванию игр, см. game_facts.DuoIndex) -> таблица."""
+    if not rows:
+        return None
+    duo_stats = []
+    for champions, games, wins in rows:
+        row = {}
+        for role, champ in zip(roles, champions):
+            row[f'Icon_{role}'] = get_champion_icon(champ)
+            row[role] = champ
+        row.update({'Matches': games, 'Win Rate (%)': wins / games * 100})
+        duo_stats.append(row)
+    df_duo = pd.DataFrame(duo_stats)
+    df_duo['Win Rate (%)'] = df_duo['Win Rate (%)'].apply(color_win_rate)
+    return df_duo.to_html(escape=False, index=False, classes='styled-table small-table')
+
+def draft_result(draft):
+    """"Win"/"Loss" для команды, с точки зрения которой записан драфт."""
+    side = draft.get('side')
+    winner_side = draft.get('winner_side')
+    is_winner = False
+    if side and winner_side: is_winner = (side == winner_side)
+    return "Win" if is_winner else "Loss"
+
+# Стили драфта задаются классами ячеек, а не стилем каждой ячейки (как делал Styler)
+DRAFT_TABLE_CSS = """<style>
+.drafts-table td, .drafts-table th { text-align: center; vertical-align: middle; }
+.drafts-table .draft-action { font-weight: bold; }
+.drafts-table .draft-ban .draft-action { color: #4d0f0f; }
+.drafts-table .draft-pick .draft-action { color: #002b4d; }
+.drafts-table .draft-ban .draft-champ.filled { background-color: #4d0f0f; color: white; }
+.drafts-table .draft-pick .draft-champ.filled { background-color: #002b4d; color: white; }
+.drafts-table .draft-win { background-color: green; color: white; font-weight: bold; }
+.drafts-table .draft-loss { background-color: red; color: white; font-weight: bold; }
+</style>"""
+# Порядок драфта: (действие, индекс в списке банов/пиков) - 3 бана, 3 пика, 2 бана, 2 пика
+DRAFT_ORDER = [("Ban", 0), ("Ban", 1), ("Ban", 2), ("Pick", 0), ("Pick", 1), ("Pick", 2),
+               ("Ban", 3), ("Ban", 4), ("Pick", 3), ("Pick", 4)]
+
+def _draft_champion_cell(champions, idx):
+    champion = champions[idx] if idx < len(champions) else "N/A"
+    if not isinstance(champion, str) or champion in ("", "N/A"):
+        return '<td class="draft-champ"></td>'
+    return f'<td class="draft-champ filled">{get_champion_icon(champion)} {escape(champion)}</td>'
+
+@functools.lru_cache(maxsize=1024)
+def _draft_table_html(team_name, opponent, team_bans, opponent_bans, team_picks, opponent_picks, result, vod_link, patch_version, generation):
+    # patch_version и generation - части ключа кэша: иконки зависят от патча и от того, загружены ли они
+    vod_html = f'<a href="{escape(vod_link)}" target="_blank">VOD</a>' if vod_link != "N/A" else ""
+    rows = []
+    for row_idx, (action, idx) in enumerate(DRAFT_ORDER):
+        team_list, opponent_list = (team_bans, opponent_bans) if action == "Ban" else (team_picks, opponent_picks)
+        if row_idx == 0:
+            info = f'<td class="draft-info">{vod_html}</td>'
+        elif row_idx == 2:
+            info = f'<td class="draft-info draft-{result.lower()}">{result}</td>'
+        else:
+            info = '<td class="draft-info"></td>'
+        rows.append(f'<tr class="draft-{action.lower()}">{_draft_champion_cell(team_list, idx)}'
+                    f'<td class="draft-action">{action}</td>{_draft_champion_cell(opponent_list, idx)}{info}</tr>')
+    return (f'{DRAFT_TABLE_CSS}<table class="styled-table drafts-table small-table">'
+            f'<thead><tr><th>{escape(team_name)}</th><th>Action</th><th>{escape(opponent)}</th><th>Info</th></tr></thead>'
+            f'<tbody>{"".join(rows)}</tbody></table>')
+
+def draft_table_html(draft, team_name):
+    """Драфт одной игры: 10 строк (3 бана, 3 пика, 2 бана, 2 пика) команды и оппонента.
+
+    Статическая разметка с классами ячеек; готовая таблица запоминается по содержимому драфта.
+    """
+    vod_link = draft.get('vod_link', "N/A")
+    return _draft_table_html(
+        str(team_name), str(draft.get('opponent', 'Opponent')),
+        tuple(draft.get('team_bans', ['N/A']*5)), tuple(draft.get('opponent_bans', ['N/A']*5)),
+        tuple(draft.get('team_picks', ['N/A']*5)), tuple(draft.get('opponent_picks', ['N/A']*5)),
+        draft_result(draft), vod_link if isinstance(vod_link, str) and vod_link else "N/A", get_patch_version(), icon_generation())
+
+def soloq_stats_table_html(stats):
+    """Статистика игрока по чемпионам (soloq.player_champion_stats) -> таблица по убыванию игр."""
+    if not stats:
+        return None
+    df_stats = pd.DataFrame(stats).sort_values("Games", ascending=False)
+    df_stats["Win Rate (%)"] = df_stats["Win Rate (%)"].apply(color_win_rate)
+    return df_stats.to_html(escape=False, index=False, classes='styled-table')
+
+# --- Кэш готовых HTML-фрагментов секций ---
+# Таблицы секции зависят только от снимка датасета (и патча с поколением иконок - из-за иконок), поэтому
+# строятся один раз на (команда, секция, версия датасета, патч, поколение иконок) для всех сессий и перезапусков
+RENDER_CACHE_KEEP_VERSIONS = 2 # Текущая и предыдущая: сессии, еще открытые на старом снимке, не вытесняют новый
+_render_cache = {} # {(team, section, dataset version, patch, icon generation): фрагменты}
+_render_cache_lock = threading.Lock()
+
+def cached_section(team, section, version, build):
+    """Фрагменты секции из кэша; при промахе - build() (например, {роль: html}).
+
+    Записи версий датасета старше RENDER_CACHE_KEEP_VERSIONS последних и записи прошлых поколений иконок
+    удаляются при добавлении новой.
+    """
+    generation = icon_generation()
+    key = (team, section, version, get_patch_version(), generation)
+    with _render_cache_lock:
+        fragments = _render_cache.get(key)
+    if fragments is not None:
+        return fragments
+    fragments = build()
+    with _render_cache_lock:
+        _render_cache[key] = fragments
+        min_version = max(cache_key[2] for cache_key in _render_cache) - RENDER_CACHE_KEEP_VERSIONS + 1
+        for cache_key in [cache_key for cache_key in _render_cache if cache_key[2] < min_version or cache_key[4] < generation]:
+            del _render_cache[cache_key]
+    return fragments
@@ -0,0 +1,287 @@
+"""Асинхронный клиент Riot API с общим на процесс лимитером запросов.
+
+Лимитер соблюдает окна ключа (X-App-Rate-Limit, например 20:1 и 100:120) и окна
+каждого метода (X-Method-Rate-Limit): лимиты и текущие счетчики берутся из
+заголовков ответов, а 429 блокирует окно на Retry-After секунд. Запросы идут
+через requests в пуле потоков, ожидание лимита - через asyncio.sleep, так что
+много корутин делят один бюджет ключа.
+"""
+import os
+import json
+import time
+import asyncio
+import threading
+from collections import deque
+from urllib.parse import quote
+import requests
+from requests.adapters import HTTPAdapter
+
+RIOT_API_KEY = os.getenv("RIOT_API_KEY", "RGAPI-2364bf09-8116-4d02-9dde-e2ed7cde4af8")
+RIOT_REGION_URL = "https://europe.api.riotgames.com"
+# Лимиты dev/personal ключа; реальные значения приходят в заголовках первого ответа
+DEFAULT_APP_RATE_LIMIT = "20:1,100:120"
+RIOT_REQUEST_TIMEOUT = 10
+RIOT_MAX_RETRIES = 3
+RIOT_HTTP_POOL_SIZE = 20
+# Запас к окну: сервер считает запрос по времени прихода, а мы - по времени отправки
+RATE_LIMIT_MARGIN_SECONDS = 0.1
+
+# Riot ID -> PUUID: PUUID аккаунта не меняется, поэтому храним долго
+PUUID_CACHE_FILE = os.path.join("data", "riot", "puuid_cache.json")
+PUUID_CACHE_TTL_SECONDS = 30 * 24 * 60 * 60
+
+ACCOUNT_BY_RIOT_ID = "account-v1.by-riot-id"
+MATCH_IDS_BY_PUUID = "match-v5.ids-by-puuid"
+MATCH_BY_ID = "match-v5.match"
+# Максимум count у match-v5 by-puuid/ids
+MATCH_IDS_PAGE_SIZE = 100
+
+
+def parse_rate_limits(header):
+    """"20:1,100:120" -> [(20, 1), (100, 120)] (лимит, окно в секундах)."""
+    limits = []
+    for part in (header or "").split(","):
+        if ":" in part:
+            count, seconds = part.split(":", 1)
+            limits.append((int(count), int(seconds)))
+    return limits
+
+class RiotNotFound(Exception):
+    """404/400 от Riot API: Riot ID не существует (переименован) или PUUID не подходит к ключу."""
+
+class RateLimitWindow:
+    """Скользящее окно: не больше limit запросов за seconds секунд."""
+    def __init__(self, limit, seconds):
+        self.limit = limit
+        self.seconds = seconds
+        self.sent = deque()
+
+    def _expire(self, now):
+        while self.sent and self.sent[0] <= now - self.seconds:
+            self.sent.popleft()
+
+    def wait_time(self, now):
+        self._expire(now)
+        if len(self.sent) < self.limit:
+            return 0.0
+        return self.sent[0] + self.seconds + RATE_LIMIT_MARGIN_SECONDS - now
+
+    def record(self, now):
+        self.sent.append(now)
+
+    def sync_count(self, count, now):
+        # Ключ могли использовать и другие процессы: догоняем счетчик сервера
+        self._expire(now)
+        while len(self.sent) < count:
+            self.sent.append(now)
+
+class RateLimiter:
+    """Окна ключа и методов; acquire() ждет, пока запрос помещается во все окна своей группы."""
+    def __init__(self, app_rate_limit=DEFAULT_APP_RATE_LIMIT):
+        self._lock = threading.Lock()
+        self._windows = {'app': self._make_windows(parse_rate_limits(app_rate_limit))}
+        self._blocked_until = {}
+
+    @staticmethod
+    def _make_windows(limits):
+        return {seconds: RateLimitWindow(limit, seconds) for limit, seconds in limits}
+
+    def _try_acquire(self, method):
+        now = time.monotonic()
+        with self._lock:
+            scopes = ['app', method]
+            wait = max([self._blocked_until.get(scope, 0.0) - now for scope in scopes] +
+                       [window.wait_time(now) for scope in scopes for window in self._windows.get(scope, {}).values()])
+            if wait > 0:
+                return wait
+            for scope in scopes:
+                for window in self._windows.get(scope, {}).values():
+                    window.record(now)
+            return 0.0
+
+    async def acquire(self, method):
+        while True:
+            wait = self._try_acquire(method)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def update_from_headers(self, method, headers):
+        """Подстраивает окна под X-App/X-Method-Rate-Limit(-Count) из ответа."""
+        now = time.monotonic()
+        with self._lock:
+            for scope, prefix in (('app', 'X-App-Rate-Limit'), (method, 'X-Method-Rate-Limit')):
+                limits = parse_rate_limits(headers.get(prefix))
+                if limits:
+                    windows = self._windows.setdefault(scope, {})
+                    for limit, seconds in limits:
+                        if seconds in windows:
+                            windows[seconds].limit = limit
+                        else:
+                            windows[seconds] = RateLimitWindow(limit, seconds)
+                for count, seconds in parse_rate_limits(headers.get(f"{prefix}-Count")):
+                    window = self._windows.get(scope, {}).get(seconds)
+                    if window:
+                        window.sync_count(count, now)
+
+    def block(self, method, headers):
+        """429: блокирует окно, которое превышено (ключ, метод или сервис), на Retry-After секунд."""
+        retry_after = float(headers.get("Retry-After") or 1)
+        scope = 'app' if headers.get("X-Rate-Limit-Type") == "application" else method
+        with self._lock:
+            self._blocked_until[scope] = max(self._blocked_until.get(scope, 0.0), time.monotonic() + retry_after)
+        return retry_after
+
+# Один лимитер на процесс: бюджет ключа общий для всех синхронизаций
+_rate_limiter = RateLimiter()
+
+def get_rate_limiter():
+    return _rate_limiter
+
+class RiotClient:
+    """Методы Riot API, которые использует SoloQ. Не-200 ответы возвращаются как None (после повторов)."""
+    def __init__(self, api_key=RIOT_API_KEY, limiter=None, base_url=RIOT_REGION_URL, max_retries=RIOT_MAX_RETRIES):
+        self.api_key = api_key
+        self.limiter = limiter or get_rate_limiter()
+        self.base_url = base_url
+        self.max_retries = max_retries
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=RIOT_HTTP_POOL_SIZE, pool_maxsize=RIOT_HTTP_POOL_SIZE)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    async def get(self, method, path, params=None, raise_not_found=False):
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire(method)
+            try:
+                response = await asyncio.to_thread(
+                    self.session.get, f"{self.base_url}{path}", params=params,
+                    headers={"X-Riot-Token": self.api_key}, timeout=RIOT_REQUEST_TIMEOUT)
+            except requests.RequestException as e:
+                print(f"Riot API request failed ({method} {path}): {e}")
+                await asyncio.sleep(2 ** attempt)
+                continue
+            self.limiter.update_from_headers(method, response.headers)
+            if response.status_code == 200:
+                return response.json()
+            if response.status_code == 429:
+                retry_after = self.limiter.block(method, response.headers)
+                print(f"Riot API 429 for {method}, retrying after {retry_after:.0f}s")
+                continue
+            if response.status_code >= 500:
+                await asyncio.sleep(2 ** attempt)
+                continue
+            # 400 приходит на PUUID, зашифрованный другим ключом - для вызывающего это тоже "не найден"
+            if response.status_code in (400, 404) and raise_not_found:
+                raise RiotNotFound(f"{method} {path}")
+            print(f"Riot API {response.status_code} for {method} {path}")
+            return None
+        print(f"Riot API gave up on {method} {path} after {self.max_retries + 1} attempts")
+        return None
+
+    async def get_account_by_riot_id(self, game_name, tag_line, raise_not_found=False):
+        return await self.get(ACCOUNT_BY_RIOT_ID, f"/riot/account/v1/accounts/by-riot-id/{quote(game_name, safe='')}/{quote(tag_line, safe='')}",
+                              raise_not_found=raise_not_found)
+
+    async def get_match_ids(self, puuid, start=0, count=MATCH_IDS_PAGE_SIZE, start_time=None, raise_not_found=False):
+        params = {"start": start, "count": count}
+        if start_time is not None:
+            params["startTime"] = int(start_time) # Секунды epoch
+        return await self.get(MATCH_IDS_BY_PUUID, f"/lol/match/v5/matches/by-puuid/{puuid}/ids", params,
+                              raise_not_found=raise_not_found)
+
+    async def get_all_match_ids(self, puuid, start_time=None, max_ids=None, raise_not_found=False):
+        """Все ID матчей с start_time (новые первыми), постранично через start; None, если первая страница не пришла."""
+        match_ids = []
+        while max_ids is None or len(match_ids) < max_ids:
+            page = await self.get_match_ids(puuid, start=len(match_ids), start_time=start_time,
+                                            raise_not_found=raise_not_found and not match_ids)
+            if page is None:
+                if not match_ids:
+                    return None
+                print(f"Match ID pagination stopped at {len(match_ids)} for {puuid}")
+                break
+            match_ids.extend(page)
+            if len(page) < MATCH_IDS_PAGE_SIZE:
+                break
+        return match_ids if max_ids is None else match_ids[:max_ids]
+
+    async def get_match(self, match_id):
+        return await self.get(MATCH_BY_ID, f"/lol/match/v5/matches/{match_id}")
+
+    def close(self):
+        self.session.close()
+
+class PuuidCache:
+    """Riot ID -> PUUID на диске (data/riot/puuid_cache.json) с долгим TTL."""
+    def __init__(self, path=PUUID_CACHE_FILE, ttl_seconds=PUUID_CACHE_TTL_SECONDS):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries = None
+
+    @staticmethod
+    def key(game_name, tag_line):
+        # Riot ID не чувствителен к регистру
+        return f"{game_name}#{tag_line}".lower()
+
+    def _load(self):
+        if self._entries is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                self._entries = {}
+        return self._entries
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+
+    def get(self, game_name, tag_line, allow_stale=False):
+        with self._lock:
+            entry = self._load().get(self.key(game_name, tag_line))
+        if not entry:
+            return None
+        if not allow_stale and time.time() - entry.get('resolved_at', 0) > self.ttl_seconds:
+            return None
+        return entry['puuid']
+
+    def put(self, game_name, tag_line, puuid):
+        with self._lock:
+            self._load()[self.key(game_name, tag_line)] = {'puuid': puuid, 'resolved_at': time.time()}
+            self._save()
+
+    def forget(self, game_name, tag_line):
+        with self._lock:
+            if self._load().pop(self.key(game_name, tag_line), None) is not None:
+                self._save()
+
+_puuid_cache = PuuidCache()
+
+def get_puuid_cache():
+    return _puuid_cache
+
+async def resolve_puuid(client, game_name, tag_line, cache=None, refresh=False):
+    """PUUID аккаунта: из кэша без запроса, иначе через account-v1 (и сохраняется в кэш).
+
+    Если Riot ID больше не находится (404 - аккаунт переименован), используется последний известный PUUID.
+    """
+    cache = cache or get_puuid_cache()
+    if not refresh:
+        puuid = cache.get(game_name, tag_line)
+        if puuid:
+            return puuid
+    try:
+        account = await client.get_account_by_riot_id(game_name, tag_line, raise_not_found=True)
+    except RiotNotFound:
+        stale_puuid = cache.get(game_name, tag_line, allow_stale=True)
+        print(f"Riot ID {game_name}#{tag_line} not found" + (", using last known PUUID" if stale_puuid and not refresh else ""))
+        return None if refresh else stale_puuid
+    if not account:
+        return cache.get(game_name, tag_line, allow_stale=True)
+    cache.put(game_name, tag_line, account["puuid"])
+    return account["puuid"]
@@ -0,0 +1,540 @@
+"""SoloQ: история игроков из Riot API в хранилище (SQLite, см. soloq_storage) с зеркалом в Google Sheets (по листу на игрока)."""
+import os
+import json
+import time
+import asyncio
+import threading
+from datetime import datetime
+import gspread
+from oauth2client.service_account import ServiceAccountCredentials
+from riot_api import RiotClient, RiotNotFound, resolve_puuid
+from match_store import MatchFetcher, get_match_store
+from soloq_storage import SOLOQ_COLUMNS, SoloQStorage, SqliteSoloQStorage, soloq_frame
+
+# Team roster for UOL SE
+team_rosters = {
+    "Unicorns of Love Sexy Edition": {
+        "Fornoreason": {"game_name": ["床前明月光疑是地上霜举头望明月低", "FornoReason"], "tag_line": ["CN1", "Gap"], "role": "TOP"},
+        "White": {"game_name": ["Alsabr"], "tag_line": ["314"], "role": "JUNGLE"},
+        "Simpli": {"game_name": ["Simpli"], "tag_line": ["Jasmi"], "role": "MIDDLE"},
+        "DenVoksne": {"game_name": ["Ignacarious", "Mαster Oogwαy"], "tag_line": ["5232", "EUW"], "role": "BOTTOM"},
+        "seaz": {"game_name": ["고군분투일취월장", "ASV13 08"], "tag_line": ["KR6", "1130"], "role": "UTILITY"},
+    }
+}
+
+SOLOQ_SPREADSHEET_NAME = "Soloq_UOL"
+# Чтения листов кэшируются в процессе: перерисовки страницы не ходят в Sheets
+SHEETS_READ_TTL_SECONDS = 120
+# Где хранится история: "sqlite" (по умолчанию, таблица - зеркало) или "sheets" (таблица и есть хранилище)
+SOLOQ_STORAGE = os.getenv("SOLOQ_STORAGE", "sqlite")
+SOLOQ_SHEETS_MIRROR = os.getenv("SOLOQ_SHEETS_MIRROR", "1") == "1"
+
+_spreadsheet = None
+_spreadsheet_lock = threading.Lock()
+_sheet_cache = {} # {(spreadsheet id, игроки): (время чтения, {player: values})}
+_sheet_cache_lock = threading.Lock()
+
+class GoogleSheetsUnavailable(Exception):
+    """Нет учетных данных Google Sheets (GOOGLE_SHEETS_CREDS)."""
+
+def setup_google_sheets():
+    # Вызывается и из фонового поллера, где st.error некуда показать: ошибку показывает тот, кто ее поймал
+    # Определяем scope
+    scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+
+    # Получаем данные сервисного аккаунта из переменной окружения
+    json_creds = os.getenv("GOOGLE_SHEETS_CREDS")
+    if not json_creds:
+        raise GoogleSheetsUnavailable("Не удалось загрузить учетные данные Google Sheets.")
+
+    # Парсим JSON-строку в словарь
+    creds_dict = json.loads(json_creds)
+
+    # Авторизуемся с использованием словаря
+    creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, scope)
+    client = gspread.authorize(creds)
+    return client
+
+def open_soloq_spreadsheet():
+    """Таблица SoloQ; клиент и открытая таблица переиспользуются между перезапусками скрипта."""
+    global _spreadsheet
+    with _spreadsheet_lock:
+        if _spreadsheet is None:
+            _spreadsheet = setup_google_sheets().open(SOLOQ_SPREADSHEET_NAME)
+        return _spreadsheet
+
+def _sheet_range(title):
+    return "'" + title.replace("'", "''") + "'!A:H"
+
+def read_player_sheets(spreadsheet, players, max_age=SHEETS_READ_TTL_SECONDS):
+    """{player: значения листа (первая строка - заголовок)} для всех игроков одним values_batch_get.
+
+    Результат кэшируется в процессе на max_age секунд; после своих записей вызывать invalidate_sheet_cache().
+    """
+    players = list(players)
+    key = (spreadsheet.id, tuple(players))
+    with _sheet_cache_lock:
+        cached = _sheet_cache.get(key)
+    if cached and time.time() - cached[0] < max_age:
+        return cached[1]
+
+    ranges = [_sheet_range(player) for player in players]
+    try:
+        response = spreadsheet.values_batch_get(ranges)
+    except gspread.exceptions.APIError as e:
+        # Скорее всего нет листа нового игрока - создаем недостающие и читаем еще раз
+        print(f"Sheets batch read failed ({e}), creating missing worksheets")
+        for player in players:
+            check_if_worksheets_exists(spreadsheet, player)
+        response = spreadsheet.values_batch_get(ranges)
+
+    # Sheets не возвращает пустые ячейки в конце строки - добиваем до ширины листа, как get_all_values
+    width = len(SOLOQ_COLUMNS)
+    sheets = {}
+    for player, value_range in zip(players, response.get('valueRanges', [])):
+        sheets[player] = [row + [""] * (width - len(row)) for row in value_range.get('values', [])]
+    with _sheet_cache_lock:
+        _sheet_cache[key] = (time.time(), sheets)
+    return sheets
+
+def invalidate_sheet_cache(spreadsheet):
+    with _sheet_cache_lock:
+        for key in [key for key in _sheet_cache if key[0] == spreadsheet.id]:
+            del _sheet_cache[key]
+
+def check_if_worksheets_exists(spreadsheet, name):
+    try:
+        wks = spreadsheet.worksheet(name)
+    except gspread.exceptions.WorksheetNotFound:
+        wks = spreadsheet.add_worksheet(title=name, rows=1200, cols=10)
+    return wks
+
+def parse_match_row(match_data, puu_id, game_id):
+    """Строка листа игрока из ответа match-v5: [дата, матч_айди, победа, чемпион, роль, киллы, смерти, ассисты]."""
+    participants = match_data['metadata']['participants']
+    player_index = participants.index(puu_id)
+    player_data = match_data['info']['participants'][player_index]
+    champion_name = player_data['championName']
+    kills = player_data['kills']
+    deaths = player_data['deaths']
+    assists = player_data['assists']
+    position = player_data['teamPosition']
+    is_win = 1 if player_data["win"] else 0
+    game_creation = datetime.fromtimestamp(match_data['info']['gameCreation'] / 1000)
+
+    return [
+        game_creation.strftime('%Y-%m-%d %H:%M:%S'),
+        game_id,
+        is_win,
+        champion_name,
+        position,
+        kills,
+        deaths,
+        assists
+    ]
+
+# Синхронизация аккаунта: новый аккаунт догружается на SOLOQ_BACKFILL_DAYS назад,
+# дальше запрашиваются только игры новее последней сохраненной (с небольшим перекрытием)
+SOLOQ_BACKFILL_DAYS = int(os.getenv("SOLOQ_BACKFILL_DAYS", "120"))
+SOLOQ_SYNC_OVERLAP_SECONDS = 3 * 60 * 60
+SOLOQ_MAX_BACKFILL_IDS = 2000
+SYNC_STATE_FILE = os.path.join("data", "riot", "sync_state.json")
+
+class AccountSyncState:
+    """Время последней сохраненной игры по каждому аккаунту (data/riot/sync_state.json)."""
+    def __init__(self, path=SYNC_STATE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = None
+
+    def _load(self):
+        if self._entries is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                self._entries = {}
+        return self._entries
+
+    def newest_game_time(self, puuid):
+        with self._lock:
+            return self._load().get(puuid, {}).get('newest_game_time')
+
+    def set_newest_game_time(self, puuid, game_time):
+        with self._lock:
+            entry = self._load().setdefault(puuid, {})
+            entry['newest_game_time'] = max(game_time, entry.get('newest_game_time') or 0)
+            entry['synced_at'] = time.time()
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, indent=1)
+            os.replace(tmp_path, self.path)
+
+_sync_state = AccountSyncState()
+
+def _sync_start_time(puuid, sync_state):
+    newest = sync_state.newest_game_time(puuid)
+    if newest:
+        return newest - SOLOQ_SYNC_OVERLAP_SECONDS
+    return time.time() - SOLOQ_BACKFILL_DAYS * 24 * 60 * 60
+
+SHEET_INDEX_FILE = os.path.join("data", "riot", "sheet_index.json")
+
+class SheetMatchIndex:
+    """Матч_айди, уже записанные в каждый лист игрока (data/riot/sheet_index.json).
+
+    Индекс листа заполняется один раз из колонки Матч_айди, дальше пополняется нашими записями -
+    синхронизация не перечитывает колонку, которая растет вместе с историей.
+    Если строки листа удаляли вручную, индекс этого листа нужно сбросить (forget).
+    """
+    def __init__(self, path=SHEET_INDEX_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = None
+
+    @staticmethod
+    def key(worksheet):
+        return f"{worksheet.spreadsheet_id}/{worksheet.title}"
+
+    def _load(self):
+        if self._entries is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                self._entries = {}
+        return self._entries
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f)
+        os.replace(tmp_path, self.path)
+
+    def known_ids(self, worksheet):
+        with self._lock:
+            match_ids = self._load().get(self.key(worksheet))
+        if match_ids is None:
+            match_ids = worksheet.col_values(2)  # Матч_айди из второй колонки
+            with self._lock:
+                self._load()[self.key(worksheet)] = match_ids
+                self._save()
+        return set(match_ids)
+
+    def add(self, worksheet, match_ids):
+        with self._lock:
+            known = self._load().setdefault(self.key(worksheet), [])
+            seen = set(known)
+            known.extend(match_id for match_id in match_ids if match_id not in seen)
+            self._save()
+
+    def forget(self, worksheet):
+        with self._lock:
+            if self._load().pop(self.key(worksheet), None) is not None:
+                self._save()
+
+_sheet_index = SheetMatchIndex()
+
+def get_sheet_index():
+    return _sheet_index
+
+def _cell(value):
+    # Как append_rows с RAW: числа остаются числами, остальное - строкой
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {'userEnteredValue': {'numberValue': value}}
+    return {'userEnteredValue': {'stringValue': str(value)}}
+
+def append_rows_batch(spreadsheet, rows_by_worksheet):
+    """Дописывает строки в несколько листов одним batchUpdate (appendCells на каждый лист, строки добавляются сами)."""
+    requests_body = [
+        {'appendCells': {
+            'sheetId': worksheet.id,
+            'rows': [{'values': [_cell(value) for value in row]} for row in rows],
+            'fields': 'userEnteredValue',
+        }}
+        for worksheet, rows in rows_by_worksheet if rows
+    ]
+    if requests_body:
+        spreadsheet.batch_update({'requests': requests_body})
+
+async def sync_account(client, known_ids, game_name, tag_line, on_progress=None, sync_state=None, matches_source=None):
+    """Новые игры аккаунта в виде строк SOLOQ_COLUMNS (в хранилище не записываются).
+
+    known_ids - Матч_айди, которые уже есть в хранилище игрока (storage.known_ids).
+    Запрашиваются только ID матчей новее последней сохраненной игры аккаунта;
+    для нового аккаунта - вся история за SOLOQ_BACKFILL_DAYS (постранично).
+    Полные ответы матчей сохраняются в match_store (matches_source - общий MatchFetcher синхронизации).
+    on_progress(done, total) вызывается после каждого загруженного матча.
+    Возвращает (puuid, строки, sync_until) или None. sync_until - новая граница синхронизации аккаунта
+    (None, если часть матчей не загрузилась); сохранять ее нужно после записи строк в хранилище.
+    """
+    sync_state = sync_state or _sync_state
+    matches_source = matches_source or MatchFetcher(client)
+
+    puu_id = await resolve_puuid(client, game_name, tag_line)
+    if not puu_id:
+        return None
+    try:
+        matches = await client.get_all_match_ids(puu_id, _sync_start_time(puu_id, sync_state), SOLOQ_MAX_BACKFILL_IDS, raise_not_found=True)
+    except RiotNotFound:
+        # PUUID из кэша не подходит (например, сменился API-ключ) - резолвим Riot ID заново
+        puu_id = await resolve_puuid(client, game_name, tag_line, refresh=True)
+        matches = await client.get_all_match_ids(puu_id, _sync_start_time(puu_id, sync_state), SOLOQ_MAX_BACKFILL_IDS) if puu_id else None
+    if matches is None:
+        return None
+
+    new_ids = [game_id for game_id in matches if game_id not in known_ids]
+    if on_progress:
+        on_progress(0, len(new_ids))
+
+    async def fetch(game_id):
+        return game_id, await matches_source.get(game_id)
+
+    new_data = []
+    newest_game_time = 0
+    all_fetched = True
+    for done, task in enumerate(asyncio.as_completed([fetch(game_id) for game_id in new_ids]), start=1):
+        game_id, match_data = await task
+        if match_data:
+            new_data.append(parse_match_row(match_data, puu_id, game_id))
+            newest_game_time = max(newest_game_time, match_data['info']['gameCreation'] // 1000)
+        else:
+            all_fetched = False
+        if on_progress:
+            on_progress(done, len(new_ids))
+
+    new_data.sort(key=lambda row: row[0])
+    # Если часть матчей не загрузилась, граница не сдвигается - они будут запрошены в следующий раз
+    sync_until = (newest_game_time or int(time.time()) - SOLOQ_SYNC_OVERLAP_SECONDS) if all_fetched else None
+    return puu_id, new_data, sync_until
+
+def _team_worksheets(spreadsheet, players):
+    """{player: лист}; недостающие листы создаются с заголовком. Один запрос метаданных вместо worksheet() на каждого игрока."""
+    worksheets = {wks.title: wks for wks in spreadsheet.worksheets()}
+    for player in players:
+        if player not in worksheets:
+            worksheets[player] = spreadsheet.add_worksheet(title=player, rows=1200, cols=10)
+            worksheets[player].append_row(SOLOQ_COLUMNS)
+    return {player: worksheets[player] for player in players}
+
+class SheetsSoloQStorage(SoloQStorage):
+    """История прямо в Google-таблице (лист на игрока): чтения - одним batch-запросом с кэшем,
+    запись - одним batchUpdate, дедупликация - по SheetMatchIndex."""
+    def __init__(self, spreadsheet):
+        self.spreadsheet = spreadsheet
+        self._worksheets = {}
+
+    def _worksheets_for(self, players):
+        missing = [player for player in players if player not in self._worksheets]
+        if missing:
+            self._worksheets.update(_team_worksheets(self.spreadsheet, missing))
+        return {player: self._worksheets[player] for player in players}
+
+    def known_ids(self, player):
+        return get_sheet_index().known_ids(self._worksheets_for([player])[player])
+
+    def add_rows(self, rows_by_player):
+        sheet_index = get_sheet_index()
+        worksheets = self._worksheets_for([player for player, rows in rows_by_player.items() if rows])
+        new_rows = {}
+        for player, worksheet in worksheets.items():
+            known = sheet_index.known_ids(worksheet)
+            new_rows[player] = sorted((row for row in rows_by_player[player] if row[1] not in known), key=lambda row: row[0])
+        try:
+            append_rows_batch(self.spreadsheet, [(worksheets[player], rows) for player, rows in new_rows.items()])
+        finally:
+            invalidate_sheet_cache(self.spreadsheet)
+        for player, rows in new_rows.items():
+            sheet_index.add(worksheets[player], [row[1] for row in rows])
+
+    def player_rows(self, player):
+        return self.team_rows([player])[player]
+
+    def team_rows(self, players):
+        # Первая строка листа - заголовок
+        return {player: values[1:] for player, values in read_player_sheets(self.spreadsheet, players).items()}
+
+    def team_games(self, players):
+        return {player: soloq_frame(rows) for player, rows in self.team_rows(players).items()}
+
+class SheetsMirror:
+    """Фоновая копия истории из SQLite в Google-таблицу - для тех, кто смотрит листы напрямую.
+
+    Дописываются только строки, которых в листе еще нет (по SheetMatchIndex), поэтому запись,
+    сорвавшаяся из-за ошибки Sheets, догоняется при следующей синхронизации.
+    """
+    def __init__(self, storage, open_spreadsheet=None):
+        self.storage = storage
+        self.open_spreadsheet = open_spreadsheet or open_soloq_spreadsheet
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._thread = None
+
+    def schedule(self, players):
+        with self._lock:
+            self._pending.update(players)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="soloq-sheets-mirror", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                players, self._pending = self._pending, set()
+                if not players:
+                    self._thread = None
+                    return
+            try:
+                self.push(players)
+            except Exception as e:
+                print(f"SoloQ sheets mirror failed: {e}")
+
+    def push(self, players):
+        spreadsheet = self.open_spreadsheet()
+        if not spreadsheet:
+            return
+        SheetsSoloQStorage(spreadsheet).add_rows({player: self.storage.player_rows(player) for player in players})
+        print(f"SoloQ sheets mirror: {len(players)} player sheets up to date")
+
+def import_sheet_history(storage, spreadsheet):
+    """Переносит в хранилище игры из листов всех игроков (первый запуск с SQLite)."""
+    sheets = SheetsSoloQStorage(spreadsheet)
+    for team_name, players in team_rosters.items():
+        rows_by_player = sheets.team_rows(players)
+        storage.add_rows(rows_by_player)
+        print(f"SoloQ history: imported {sum(len(rows) for rows in rows_by_player.values())} games of {team_name} from Google Sheets")
+
+_soloq_storage = None
+_soloq_storage_lock = threading.Lock()
+
+def get_soloq_storage():
+    """Хранилище истории SoloQ процесса (при SOLOQ_STORAGE=sheets без доступа к таблице - GoogleSheetsUnavailable).
+
+    По умолчанию - локальный SQLite, а Google-таблица - его фоновое зеркало (если есть GOOGLE_SHEETS_CREDS
+    и не задано SOLOQ_SHEETS_MIRROR=0). Пустой SQLite при первом запуске заполняется из таблицы.
+    """
+    global _soloq_storage
+    with _soloq_storage_lock:
+        if _soloq_storage is None:
+            if SOLOQ_STORAGE == "sheets":
+                _soloq_storage = SheetsSoloQStorage(open_soloq_spreadsheet())
+            else:
+                storage = SqliteSoloQStorage()
+                if SOLOQ_SHEETS_MIRROR and os.getenv("GOOGLE_SHEETS_CREDS"):
+                    if storage.count() == 0:
+                        try:
+                            import_sheet_history(storage, open_soloq_spreadsheet())
+                        except Exception as e:
+                            print(f"SoloQ history import from Google Sheets failed: {e}")
+                    storage.mirror = SheetsMirror(storage)
+                _soloq_storage = storage
+        return _soloq_storage
+
+async def sync_team_accounts(storage, team_name, on_progress=None):
+    """Синхронизирует все аккаунты всех игроков команды одновременно (общий лимит ключа).
+
+    Новые строки всех игроков записываются в хранилище в конце одним вызовом add_rows; границы
+    синхронизации аккаунтов обновляются только после успешной записи.
+    on_progress(player, riot_id, done, total) - прогресс по каждому аккаунту;
+    done=None означает, что аккаунт не найден или Riot API вернул ошибку.
+    Возвращает {(player, riot_id): новые строки или None}.
+    """
+    client = RiotClient()
+    # Общий источник матчей: игра, в которой были несколько наших игроков, загружается один раз
+    matches_source = MatchFetcher(client)
+    accounts = []
+    for player, player_data in team_rosters.get(team_name, {}).items():
+        known_ids = storage.known_ids(player)
+        for game_name, tag_line in zip(player_data["game_name"], player_data["tag_line"]):
+            accounts.append((player, f"{game_name}#{tag_line}", known_ids, game_name, tag_line))
+
+    async def sync_one(player, riot_id, known_ids, game_name, tag_line):
+        progress = (lambda done, total: on_progress(player, riot_id, done, total)) if on_progress else None
+        try:
+            result = await sync_account(client, known_ids, game_name, tag_line, progress, matches_source=matches_source)
+        except Exception as e:
+            print(f"SoloQ sync failed for {player} ({riot_id}): {e}")
+            result = None
+        if result is None and on_progress:
+            on_progress(player, riot_id, None, None)
+        return (player, riot_id), result
+
+    try:
+        results = dict(await asyncio.gather(*(sync_one(*account) for account in accounts)))
+        print(f"SoloQ sync: {matches_source.fetched} matches fetched, {matches_source.from_store} taken from the local store")
+    finally:
+        client.close()
+
+    # Все игроки команды, даже без новых игр: зеркало заодно догонит то, что не записалось в прошлый раз
+    rows_by_player = {player: [] for player in team_rosters.get(team_name, {})}
+    for (player, _), result in results.items():
+        if result:
+            rows_by_player[player].extend(result[1])
+    try:
+        await asyncio.to_thread(storage.add_rows, rows_by_player)
+    except Exception as e:
+        # Матчи уже в match_store: следующая синхронизация возьмет их оттуда без Riot API
+        print(f"SoloQ history write failed: {e}")
+        if on_progress:
+            for player, riot_id in results:
+                on_progress(player, riot_id, None, None)
+        return {account: None for account in results}
+
+    for result in results.values():
+        if result and result[2]:
+            _sync_state.set_newest_game_time(result[0], result[2])
+    print(f"SoloQ sync: {sum(len(rows) for rows in rows_by_player.values())} new games saved")
+    return {account: result[1] if result else None for account, result in results.items()}
+
+def rebuild_player_rows(puuids, store=None):
+    """Строки листа игрока заново из сохраненных матчей (без Riot API) - для новых метрик и восстановления листов."""
+    store = store or get_match_store()
+    puuids = set(puuids)
+    rows = []
+    for match_id, match_data in store.iter_matches():
+        for puuid in puuids.intersection(match_data['metadata']['participants']):
+            rows.append(parse_match_row(match_data, puuid, match_id))
+    return rows
+
+def champion_stats(df, role=None, since=None):
+    """Игры, победы, K/D/A, винрейт (%) и KDA (без округления) по чемпионам одной группировкой (индекс - чемпион, в порядке первой игры).
+
+    role - только игры на этой роли, since - только игры не раньше этой даты.
+    """
+    mask = df["Чемпион"].notna() & (df["Чемпион"] != "")
+    if role is not None:
+        mask &= df["Роль"] == role
+    if since is not None:
+        mask &= df["Дата матча"] >= since
+    stats = df.loc[mask].groupby("Чемпион", sort=False, observed=True).agg(
+        count=("Победа", "size"), wins=("Победа", "sum"),
+        kills=("Киллы", "sum"), deaths=("Смерти", "sum"), assists=("Ассисты", "sum"))
+    stats["win_rate"] = stats["wins"] / stats["count"] * 100
+    stats["kda"] = (stats["kills"] + stats["assists"]) / stats["deaths"].clip(lower=1)
+    return stats
+
+def aggregate_soloq_data(storage, team_name):
+    """{player: {champion: {count, wins, kills, deaths, assists}}} по играм на роли игрока, по убыванию игр и побед."""
+    data = {}
+    players = team_rosters.get(team_name, {})
+    games = storage.team_games(players)
+
+    for player, player_data in players.items():
+        stats = champion_stats(games[player], player_data["role"])
+        if stats.empty:
+            continue
+        stats = stats.sort_values(["count", "wins"], ascending=False, kind="stable")
+        data[player] = stats[["count", "wins", "kills", "deaths", "assists"]].to_dict("index")
+
+    return data
+
+def player_champion_stats(df, role, since=None):
+    """Статистика игрока по чемпионам на его роли: [{'Champion', 'Games', 'Win Rate (%)', 'KDA'}]."""
+    stats = champion_stats(df, role, since)
+    # Округление - встроенным round по готовым значениям (строк по числу чемпионов), как раньше
+    return [
+        {"Champion": champion, "Games": count, "Win Rate (%)": round(win_rate, 2), "KDA": round(kda, 2)}
+        for champion, count, win_rate, kda in zip(stats.index, stats["count"].tolist(), stats["win_rate"].tolist(), stats["kda"].tolist())
+    ]
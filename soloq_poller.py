@@ -0,0 +1,204 @@
+"""Фоновая синхронизация SoloQ по расписанию, отдельно от интерфейса.
+
+Синхронизирует все аккаунты всех команд из team_rosters раз в SOLOQ_POLL_SECONDS
+и пишет через хранилище SoloQ (get_soloq_storage). Работает либо потоком внутри
+приложения Streamlit, либо отдельным процессом:
+
+    python soloq_poller.py [--once]
+
+Синхронизирует только владелец блокировки data/soloq/poller.lock - один поллер
+на каталог данных, сколько бы процессов и сессий ни было запущено. Результат
+("последняя синхронизация") публикуется в data/soloq/sync_status.json; страница
+SoloQ только читает его и хранилище, а кнопка обновления лишь просит поллер
+синхронизироваться вне расписания.
+"""
+import os
+import json
+import time
+import asyncio
+import argparse
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from soloq import team_rosters, get_soloq_storage, sync_team_accounts
+
+SOLOQ_POLL_SECONDS = int(os.getenv("SOLOQ_POLL_SECONDS", str(30 * 60)))
+# Как часто поллер проверяет запрос "обновить сейчас" и свободна ли блокировка
+SOLOQ_POLL_CHECK_SECONDS = 5
+# Пока идет синхронизация, поллер обновляет 'heartbeat' в статусе; статус без свежего heartbeat
+# (процесс упал посреди синхронизации) считается не выполняющимся
+SYNC_HEARTBEAT_SECONDS = 30
+SYNC_STALE_SECONDS = 3 * SYNC_HEARTBEAT_SECONDS
+SOLOQ_DATA_DIR = os.path.join("data", "soloq")
+POLLER_LOCK_FILE = os.path.join(SOLOQ_DATA_DIR, "poller.lock")
+SYNC_STATUS_FILE = os.path.join(SOLOQ_DATA_DIR, "sync_status.json")
+SYNC_REQUEST_FILE = os.path.join(SOLOQ_DATA_DIR, "sync_request")
+
+
+class SingleInstanceLock:
+    """Эксклюзивная блокировка файла без ожидания; ОС снимает ее, когда процесс-владелец завершается."""
+    def __init__(self, path=POLLER_LOCK_FILE):
+        self.path = path
+        self._file = None
+
+    def acquire(self):
+        if self._file is not None:
+            return True
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        f = open(self.path, "a+")
+        try:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            f.close()
+            return False
+        f.seek(0)
+        f.truncate()
+        f.write(str(os.getpid()))
+        f.flush()
+        self._file = f
+        return True
+
+    def release(self):
+        if self._file is not None:
+            self._file.close()  # Закрытие файла снимает блокировку
+            self._file = None
+
+def read_sync_status():
+    """Последний опубликованный статус: {'running', 'pid', 'heartbeat', 'last_attempt', 'error', 'teams': {team: {'last_synced', 'new_games', 'failed'}}}.
+
+    'error' - текст ошибки последней синхронизации (None, если она прошла без исключения).
+    """
+    try:
+        with open(SYNC_STATUS_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+def is_sync_running(status):
+    """Идет ли синхронизация: флаг 'running' учитывается, только пока поллер обновляет heartbeat."""
+    return bool(status.get('running')) and time.time() - status.get('heartbeat', 0) < SYNC_STALE_SECONDS
+
+def _write_sync_status(status):
+    os.makedirs(os.path.dirname(SYNC_STATUS_FILE), exist_ok=True)
+    tmp_path = f"{SYNC_STATUS_FILE}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(status, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, SYNC_STATUS_FILE)
+
+def request_sync():
+    """Просит поллер (в любом процессе) синхронизироваться, не дожидаясь расписания."""
+    os.makedirs(os.path.dirname(SYNC_REQUEST_FILE), exist_ok=True)
+    with open(SYNC_REQUEST_FILE, "w", encoding="utf-8") as f:
+        f.write(str(time.time()))
+    _soloq_poller.wake()
+
+def _sync_requested_at():
+    try:
+        return os.path.getmtime(SYNC_REQUEST_FILE)
+    except OSError:
+        return 0.0
+
+class SoloQPoller:
+    def __init__(self, poll_seconds=SOLOQ_POLL_SECONDS, lock=None):
+        self.poll_seconds = poll_seconds
+        self.lock = lock or SingleInstanceLock()
+        self._wake = threading.Event()
+        self._start_lock = threading.Lock()
+        self._thread = None
+
+    def _due(self):
+        last_attempt = read_sync_status().get('last_attempt', 0)
+        return time.time() - last_attempt >= self.poll_seconds or _sync_requested_at() > last_attempt
+
+    def run_once(self):
+        """Синхронизирует все команды и публикует статус. Вызывать только с захваченной блокировкой."""
+        status = read_sync_status()
+        status['running'] = True
+        status['pid'] = os.getpid()
+        status['last_attempt'] = status['heartbeat'] = time.time()
+        status['error'] = None
+        _write_sync_status(status)
+        teams_status = status.setdefault('teams', {})
+        status_lock = threading.Lock()
+        stop_heartbeat = threading.Event()
+
+        def heartbeat():
+            while not stop_heartbeat.wait(SYNC_HEARTBEAT_SECONDS):
+                with status_lock:
+                    status['heartbeat'] = time.time()
+                    _write_sync_status(status)
+
+        heartbeat_thread = threading.Thread(target=heartbeat, name="soloq-poller-heartbeat", daemon=True)
+        heartbeat_thread.start()
+        try:
+            storage = get_soloq_storage()
+            for team_name in team_rosters:
+                results = asyncio.run(sync_team_accounts(storage, team_name))
+                failed = [riot_id for (_, riot_id), rows in results.items() if rows is None]
+                with status_lock:
+                    team_status = teams_status.setdefault(team_name, {})
+                    team_status['failed'] = failed
+                    if len(failed) < len(results):
+                        team_status['last_synced'] = time.time()
+                        team_status['new_games'] = sum(len(rows) for rows in results.values() if rows)
+                print(f"SoloQ poller: {team_name} synced, {team_status.get('new_games', 0)} new games, {len(failed)} accounts failed")
+        except Exception as e:
+            # Поток и --once работают без Streamlit: ошибку показывает страница SoloQ по статусу
+            print(f"SoloQ poller sync failed: {e}")
+            with status_lock:
+                status['error'] = str(e)
+        finally:
+            stop_heartbeat.set()
+            heartbeat_thread.join()
+            status['running'] = False
+            _write_sync_status(status)
+        return status
+
+    def wake(self):
+        self._wake.set()
+
+    def run_forever(self):
+        while True:
+            # Пока блокировку держит другой процесс, ждем: если он завершится, поллером станет этот
+            if self.lock.acquire() and self._due():
+                self.run_once()
+            self._wake.wait(SOLOQ_POLL_CHECK_SECONDS)
+            self._wake.clear()
+
+    def start(self):
+        """Запускает поллер фоновым потоком (один раз на процесс)."""
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self.run_forever, name="soloq-poller", daemon=True)
+            self._thread.start()
+
+_soloq_poller = SoloQPoller()
+
+def get_soloq_poller():
+    return _soloq_poller
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--once", action="store_true", help="одна синхронизация и выход")
+    args = parser.parse_args()
+    poller = get_soloq_poller()
+    if not poller.lock.acquire():
+        print(f"SoloQ poller is already running ({POLLER_LOCK_FILE} is locked)")
+        return
+    if args.once:
+        poller.run_once()
+    else:
+        poller.run_forever()
+
+if __name__ == "__main__":
+    main()
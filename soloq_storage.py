@@ -0,0 +1,155 @@
+"""Хранилище истории SoloQ.
+
+SoloQStorage - интерфейс, через который синхронизация и страница SoloQ читают
+и пишут игры игроков (строка игры - колонки SOLOQ_COLUMNS). Основная реализация -
+SQLite (data/soloq/history.sqlite) с типизированными колонками и индексами по
+игроку, дате и чемпиону; реализация поверх Google-таблицы и ее фоновое зеркало -
+в soloq.py.
+"""
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+import pandas as pd
+
+# Колонки листа игрока
+SOLOQ_COLUMNS = ["Дата матча", "Матч_айди", "Победа", "Чемпион", "Роль", "Киллы", "Смерти", "Ассисты"]
+SOLOQ_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+SOLOQ_HISTORY_FILE = os.path.join("data", "soloq", "history.sqlite")
+
+
+def typed_row(row):
+    """Строка листа (строки или числа) -> (дата, матч_айди, победа, чемпион, роль, киллы, смерти, ассисты) с int; None, если строка битая."""
+    if len(row) < len(SOLOQ_COLUMNS) or not row[1]:
+        return None
+    date, match_id, win, champion, role, kills, deaths, assists = row[:len(SOLOQ_COLUMNS)]
+    try:
+        return (str(date), str(match_id), int(win), str(champion), str(role), int(kills), int(deaths), int(assists))
+    except (TypeError, ValueError):
+        return None
+
+def _type_columns(df):
+    df["Дата матча"] = pd.to_datetime(df["Дата матча"], format=SOLOQ_DATE_FORMAT, errors='coerce')
+    for column in ("Победа", "Киллы", "Смерти", "Ассисты"):
+        df[column] = df[column].astype("int64")
+    # Чемпионов и ролей мало: категории - меньше памяти и быстрее группировки
+    for column in ("Чемпион", "Роль"):
+        df[column] = df[column].astype("category")
+    return df
+
+def soloq_frame(rows):
+    """DataFrame игр с колонками SOLOQ_COLUMNS: дата - datetime, победа и K/D/A - int, чемпион и роль - category."""
+    typed = [row for row in map(typed_row, rows) if row is not None]
+    return _type_columns(pd.DataFrame(typed, columns=SOLOQ_COLUMNS))
+
+class SoloQStorage(ABC):
+    """Интерфейс хранилища истории SoloQ (по игроку - список игр)."""
+    @abstractmethod
+    def known_ids(self, player):
+        """Матч_айди, которые уже сохранены для игрока."""
+
+    @abstractmethod
+    def add_rows(self, rows_by_player):
+        """Сохраняет новые строки {player: [строка SOLOQ_COLUMNS]}; уже известные матчи пропускаются."""
+
+    @abstractmethod
+    def player_rows(self, player):
+        """Все игры игрока строками SOLOQ_COLUMNS (по возрастанию даты)."""
+
+    def player_games(self, player):
+        return soloq_frame(self.player_rows(player))
+
+    def team_games(self, players):
+        """{player: DataFrame игр} для всех игроков команды."""
+        return {player: self.player_games(player) for player in players}
+
+class SqliteSoloQStorage(SoloQStorage):
+    def __init__(self, path=SOLOQ_HISTORY_FILE, mirror=None):
+        self.path = path
+        self.mirror = mirror  # Вызывается после каждой записи: mirror.schedule(players)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._writes = 0
+        self._frames = {} # {игроки: (версия данных, {player: DataFrame})}
+
+    def _connect(self):
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS games ("
+                " player TEXT NOT NULL,"
+                " match_id TEXT NOT NULL,"
+                " game_time TEXT NOT NULL,"  # 'YYYY-MM-DD HH:MM:SS', как в листе
+                " win INTEGER NOT NULL,"
+                " champion TEXT NOT NULL,"
+                " role TEXT NOT NULL,"
+                " kills INTEGER NOT NULL,"
+                " deaths INTEGER NOT NULL,"
+                " assists INTEGER NOT NULL,"
+                " PRIMARY KEY (player, match_id))")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS games_player_time ON games (player, game_time)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS games_champion ON games (champion)")
+        return self._conn
+
+    def known_ids(self, player):
+        with self._lock:
+            return {row[0] for row in self._connect().execute("SELECT match_id FROM games WHERE player = ?", (player,))}
+
+    def add_rows(self, rows_by_player):
+        # Все игроки - одной транзакцией
+        records = [(player,) + row for player, rows in rows_by_player.items() for row in map(typed_row, rows) if row]
+        if records:
+            with self._lock:
+                conn = self._connect()
+                with conn:
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO games (player, game_time, match_id, win, champion, role, kills, deaths, assists)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", records)
+                self._writes += 1
+        if self.mirror:
+            self.mirror.schedule(rows_by_player)
+
+    def player_rows(self, player):
+        with self._lock:
+            return [list(row) for row in self._connect().execute(
+                "SELECT game_time, match_id, win, champion, role, kills, deaths, assists"
+                " FROM games WHERE player = ? ORDER BY game_time", (player,))]
+
+    def _data_version(self, conn):
+        # Свои записи считаем сами, чужие (другой процесс, тот же файл) видны по PRAGMA data_version
+        return self._writes, conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def team_games(self, players):
+        """Один запрос на всю команду; типизированные кадры кэшируются до следующей записи в базу.
+
+        Кадры общие для всех вызывающих - их нельзя менять на месте (фильтрация создает новый кадр).
+        """
+        players = tuple(players)
+        placeholders = ",".join("?" * len(players))
+        with self._lock:
+            conn = self._connect()
+            version = self._data_version(conn)
+            cached = self._frames.get(players)
+            if cached and cached[0] == version:
+                return dict(cached[1])
+            records = conn.execute(
+                "SELECT player, game_time, match_id, win, champion, role, kills, deaths, assists"
+                f" FROM games WHERE player IN ({placeholders}) ORDER BY player, game_time", players).fetchall()
+        df = _type_columns(pd.DataFrame.from_records(records, columns=["player"] + SOLOQ_COLUMNS))
+        games = {player: group.drop(columns="player").reset_index(drop=True)
+                 for player, group in df.groupby("player", sort=False)}
+        empty = df.drop(columns="player").iloc[:0]
+        games = {player: games.get(player, empty) for player in players}
+        with self._lock:
+            self._frames[players] = (version, games)
+        return dict(games)
+
+    def count(self, player=None):
+        query, params = "SELECT COUNT(*) FROM games", ()
+        if player is not None:
+            query, params = query + " WHERE player = ?", (player,)
+        with self._lock:
+            return self._connect().execute(query, params).fetchone()[0]
@@ -0,0 +1,382 @@
+"""Извлечение строк из таблиц Leaguepedia (Match History и Picks/Bans).
+
+Каждый бэкенд превращает HTML страницы в список "сырых" строк (dict) с
+одинаковыми полями, а агрегация в data_fetching работает уже только с ними.
+Бэкенды:
+  - "bs4"      BeautifulSoup + html.parser (исходный вариант)
+  - "bs4-lxml" BeautifulSoup с деревом lxml (те же select-хелперы, быстрее парсинг)
+  - "lxml"     чистый lxml + XPath, без BeautifulSoup
+Бэкенд выбирается переменной окружения WIKI_PARSER_BACKEND.
+"""
+import os
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:  # lxml не установлен - остаются только bs4-бэкенды
+    lxml = None
+
+INVISIBLE_CHARS = "⁠"
+
+MH_TABLE_SELECTOR = '.wikitable.mhgame.sortable'
+PB_TABLE_SELECTOR = 'table.wikitable.plainlinks.hoverable-rows.column-show-hide-1'
+
+# Индексы колонок P/B: 0:Week 1:Blue 2:Red 3:Score 4:Patch 5:BB1 6:RB1 ... 10:RB3 11:BP1 12:RP1/2
+# 13:BP2/3 14:RP3 15:RB4 16:BB4 17:RB5 18:BB5 19:RP4 20:BP4/5 21:RP5 22:SB 23:VOD?
+PB_BLUE_BAN_COLS = [5, 7, 9, 16, 18]
+PB_RED_BAN_COLS = [6, 8, 10, 15, 17]
+PB_PICK_COLS = [11, 12, 13, 14, 19, 20, 21]
+
+# --- Общие хелперы для всех бэкендов ---
+def normalize_data_champion(champ_name):
+    """Приводит значение data-champion к отображаемому имени чемпиона."""
+    if champ_name.lower() == 'monkeyking': return 'Wukong'
+    if champ_name.lower() == 'jarvaniv': return 'Jarvan IV'
+    if champ_name.lower() == 'kaisa': return "Kai'Sa"
+    # Heuristic: Capitalize except for apostrophes or known multi-word names
+    if "'" in champ_name or " " in champ_name:
+        return champ_name
+    return champ_name.capitalize()
+
+def order_pb_picks(pick_cells):
+    """Раскладывает пики из колонок P/B таблицы в порядке P1..P5 для каждой стороны.
+
+    pick_cells: {индекс колонки: список чемпионов в ячейке}
+    """
+    blue_picks_ordered = ["N/A"] * 5
+    red_picks_ordered = ["N/A"] * 5
+    # BP1 (col 11)
+    bp1_champs = pick_cells[11]
+    if bp1_champs: blue_picks_ordered[0] = bp1_champs[0]
+    # RP1, RP2 (col 12)
+    rp1_2_champs = pick_cells[12]
+    if len(rp1_2_champs) > 0: red_picks_ordered[0] = rp1_2_champs[0]
+    if len(rp1_2_champs) > 1: red_picks_ordered[1] = rp1_2_champs[1]
+    # BP2, BP3 (col 13)
+    bp2_3_champs = pick_cells[13]
+    if len(bp2_3_champs) > 0: blue_picks_ordered[1] = bp2_3_champs[0]
+    if len(bp2_3_champs) > 1: blue_picks_ordered[2] = bp2_3_champs[1]
+    # RP3 (col 14)
+    rp3_champs = pick_cells[14]
+    if rp3_champs: red_picks_ordered[2] = rp3_champs[0]
+    # RP4 (col 19)
+    rp4_champs = pick_cells[19]
+    if rp4_champs: red_picks_ordered[3] = rp4_champs[0]
+    # BP4, BP5 (col 20)
+    bp4_5_champs = pick_cells[20]
+    if len(bp4_5_champs) > 0: blue_picks_ordered[3] = bp4_5_champs[0]
+    if len(bp4_5_champs) > 1: blue_picks_ordered[4] = bp4_5_champs[1]
+    # RP5 (col 21)
+    rp5_champs = pick_cells[21]
+    if rp5_champs: red_picks_ordered[4] = rp5_champs[0]
+    return blue_picks_ordered, red_picks_ordered
+
+def find_vod_link(col_links):
+    """Ищет ссылку на VOD среди колонок после 21-й.
+
+    col_links: href первой ссылки в каждой колонке строки (None, если ссылки нет).
+    """
+    for col_idx in range(len(col_links)-1, 21, -1):
+        href = col_links[col_idx]
+        # Предполагаем, что VOD - это внешняя ссылка
+        if href is not None and not href.startswith('/'):
+            return href
+        # Иногда ссылка на Scoreboard в предпоследней колонке - проверяем предыдущую колонку на VOD
+        elif href is not None and 'Scoreboards' in href:
+            prev_href = col_links[col_idx-1]
+            if prev_href is not None and not prev_href.startswith('/'):
+                return prev_href
+    return "N/A"
+
+def _mh_row(table_index, row_index, date, patch, teams, bans, picks):
+    return {
+        'table_index': table_index, 'row_index': row_index,
+        'date': date, 'patch': patch,
+        'blue': teams[0], 'red': teams[1], 'winner': teams[2],
+        'blue_bans': bans[0], 'red_bans': bans[1],
+        'blue_picks': picks[0], 'red_picks': picks[1],
+    }
+
+def _pb_row(table_index, row_index, week, patch, blue, red, winner_side, bans, pick_cells, vod_link):
+    blue_picks_ordered, red_picks_ordered = order_pb_picks(pick_cells)
+    return {
+        'table_index': table_index, 'row_index': row_index,
+        'week': week, 'patch': patch,
+        'blue': blue, 'red': red, 'winner_side': winner_side,
+        'blue_bans': bans[0], 'red_bans': bans[1],
+        'blue_picks': blue_picks_ordered, 'red_picks': red_picks_ordered,
+        'vod_link': vod_link,
+    }
+
+# --- Бэкенд BeautifulSoup ---
+def get_champion_from_title(span_tag):
+    if span_tag and 'title' in span_tag.attrs:
+        return span_tag['title']
+    return "N/A"
+
+# Helper function to safely get team name from complex cell structure in MH table
+def get_team_name_from_mh_cell(cell):
+    # Try finding 'a' tag with title directly within the cell
+    link = cell.select_one('a[title]')
+    if link and link.get('title'):
+        return link['title']
+    # Try finding img tag and getting title from its parent 'a' tag
+    img = cell.select_one('img')
+    if img:
+        parent_link = img.find_parent('a')
+        if parent_link and parent_link.get('title'):
+            return parent_link['title']
+    # Fallback to cell text if nothing else found
+    cleaned_text = cell.text.strip().replace(INVISIBLE_CHARS, "") # Удаляем невидимые символы
+    return cleaned_text if cleaned_text else "unknown"
+
+def get_champion_from_span(span_tag):
+    if span_tag:
+        # Попробуем извлечь из вложенного span с title
+        nested_span = span_tag.select_one('.sprite.champion-sprite')
+        if nested_span and 'title' in nested_span.attrs:
+            return nested_span['title']
+        # Попробуем извлечь из data-champion родительского span
+        if 'data-champion' in span_tag.attrs:
+            return span_tag.get('data-champion')
+        # Попробуем извлечь из title самого span (если нет вложенного)
+        if 'title' in span_tag.attrs:
+             return span_tag['title']
+        # Если ничего не найдено в pbh-cn, поищем простой champion-sprite
+        simple_sprite = span_tag.find_parent('td').select_one('span.champion-sprite')
+        if simple_sprite and 'title' in simple_sprite.attrs:
+            return simple_sprite['title']
+    return "N/A"
+
+def get_champion_from_draft_cell(cell):
+    if not cell: return "N/A"
+    # Try the specific structure first: td -> span.pbh-cn -> span.sprite[title]
+    pbh_cn = cell.select_one('span.pbh-cn')
+    if pbh_cn:
+        sprite = pbh_cn.select_one('span.sprite.champion-sprite')
+        if sprite and 'title' in sprite.attrs:
+            return sprite['title']
+        # Fallback to data-champion on pbh-cn if title is missing
+        if 'data-champion' in pbh_cn.attrs:
+             return normalize_data_champion(pbh_cn['data-champion'])
+    # Fallback for simpler structures (like maybe bans in some old formats)
+    sprite = cell.select_one('span.sprite.champion-sprite')
+    if sprite and 'title' in sprite.attrs:
+        return sprite['title']
+    return "N/A"
+
+# Helper to get champion from potentially multiple spans in a cell (for P/B table)
+def get_champions_from_draft_pick_cell(cell):
+    champions = []
+    if not cell: return ["N/A"]
+    spans = cell.select('span.pbh-cn')
+    if spans:
+        for span in spans:
+             sprite = span.select_one('span.sprite.champion-sprite')
+             if sprite and 'title' in sprite.attrs:
+                 champions.append(sprite['title'])
+             elif 'data-champion' in span.attrs:
+                  champions.append(normalize_data_champion(span['data-champion']))
+             else:
+                  champions.append("N/A")
+    else: # Fallback if no pbh-cn spans
+         sprite = cell.select_one('span.sprite.champion-sprite')
+         if sprite and 'title' in sprite.attrs:
+             champions.append(sprite['title'])
+
+    return champions if champions else ["N/A"]
+
+def _bs4_table_rows(content, selector, tree_builder):
+    soup = BeautifulSoup(content, tree_builder)
+    for table_index, table in enumerate(soup.select(selector)):
+        rows = table.select('tr')
+        yield table_index, [row.select('td') for row in rows[1:]]
+
+def _bs4_extract_mh_rows(content, tree_builder):
+    for table_index, rows in _bs4_table_rows(content, MH_TABLE_SELECTOR, tree_builder):
+        for i, cols in enumerate(rows):
+            if len(cols) < 9:
+                yield {'table_index': table_index, 'row_index': i, 'skip': f"cols={len(cols)} < 9"}
+                continue
+            try:
+                teams = [get_team_name_from_mh_cell(cols[idx]) for idx in (2, 3, 4)]
+                bans = [[get_champion_from_title(s) for s in cols[idx].select('span.sprite.champion-sprite')] for idx in (5, 6)]
+                picks = [[get_champion_from_title(s) for s in cols[idx].select('span.sprite.champion-sprite')] for idx in (7, 8)]
+                yield _mh_row(table_index, i, cols[0].text.strip(), cols[1].text.strip(), teams, bans, picks)
+            except Exception as e:
+                yield {'table_index': table_index, 'row_index': i, 'error': e}
+
+def _bs4_extract_pb_rows(content, tree_builder):
+    for table_index, rows in _bs4_table_rows(content, PB_TABLE_SELECTOR, tree_builder):
+        for i, cols in enumerate(rows):
+            if len(cols) < 22:
+                yield {'table_index': table_index, 'row_index': i, 'skip': f"cols={len(cols)} < 22"}
+                continue
+            try:
+                blue = cols[1].get('title', cols[1].text).strip().replace(INVISIBLE_CHARS, "")
+                red = cols[2].get('title', cols[2].text).strip().replace(INVISIBLE_CHARS, "")
+                winner_side = None
+                if 'pbh-winner' in cols[1].get('class', []): winner_side = 'blue'
+                elif 'pbh-winner' in cols[2].get('class', []): winner_side = 'red'
+                bans = ([get_champion_from_draft_cell(cols[idx]) for idx in PB_BLUE_BAN_COLS],
+                        [get_champion_from_draft_cell(cols[idx]) for idx in PB_RED_BAN_COLS])
+                pick_cells = {idx: get_champions_from_draft_pick_cell(cols[idx]) for idx in PB_PICK_COLS}
+                col_links = []
+                for col in cols:
+                    link = col.select_one('a')
+                    col_links.append(link['href'] if link and 'href' in link.attrs else None)
+                yield _pb_row(table_index, i, cols[0].text.strip(), cols[4].text.strip(), blue, red, winner_side,
+                              bans, pick_cells, find_vod_link(col_links))
+            except Exception as e:
+                yield {'table_index': table_index, 'row_index': i, 'error': e}
+
+# --- Бэкенд lxml (XPath) ---
+def _xp_class(*classes):
+    return " and ".join(f"contains(concat(' ', normalize-space(@class), ' '), ' {c} ')" for c in classes)
+
+if lxml is not None:
+    # XPath компилируются один раз - на больших P/B страницах это заметная часть времени
+    _XP_MH_TABLES = etree.XPath(f"//*[{_xp_class('wikitable', 'mhgame', 'sortable')}]")
+    _XP_PB_TABLES = etree.XPath(f"//table[{_xp_class('wikitable', 'plainlinks', 'hoverable-rows', 'column-show-hide-1')}]")
+    _XP_CHAMP_SPRITES = etree.XPath(f".//span[{_xp_class('sprite', 'champion-sprite')}]")
+    _XP_PBH_CN = etree.XPath(f".//span[{_xp_class('pbh-cn')}]")
+    _XP_ROWS = etree.XPath(".//tr")
+    _XP_CELLS = etree.XPath(".//td")
+    _XP_LINK_WITH_TITLE = etree.XPath(".//a[@title]")
+    _XP_IMG = etree.XPath(".//img")
+    _XP_LINK = etree.XPath(".//a")
+
+def _lxml_text(el):
+    return el.text_content()
+
+def _lxml_first(el, xpath):
+    found = xpath(el)
+    return found[0] if found else None
+
+def _lxml_team_name_from_mh_cell(cell):
+    link = _lxml_first(cell, _XP_LINK_WITH_TITLE)
+    if link is not None and link.get('title'):
+        return link.get('title')
+    img = _lxml_first(cell, _XP_IMG)
+    if img is not None:
+        parent_link = next(img.iterancestors('a'), None)
+        if parent_link is not None and parent_link.get('title'):
+            return parent_link.get('title')
+    cleaned_text = _lxml_text(cell).strip().replace(INVISIBLE_CHARS, "")
+    return cleaned_text if cleaned_text else "unknown"
+
+def _lxml_sprite_titles(cell):
+    return [s.get('title', "N/A") for s in _XP_CHAMP_SPRITES(cell)]
+
+def _lxml_champion_from_draft_cell(cell):
+    pbh_cn = _lxml_first(cell, _XP_PBH_CN)
+    if pbh_cn is not None:
+        sprite = _lxml_first(pbh_cn, _XP_CHAMP_SPRITES)
+        if sprite is not None and sprite.get('title') is not None:
+            return sprite.get('title')
+        if pbh_cn.get('data-champion') is not None:
+            return normalize_data_champion(pbh_cn.get('data-champion'))
+    sprite = _lxml_first(cell, _XP_CHAMP_SPRITES)
+    if sprite is not None and sprite.get('title') is not None:
+        return sprite.get('title')
+    return "N/A"
+
+def _lxml_champions_from_draft_pick_cell(cell):
+    champions = []
+    spans = _XP_PBH_CN(cell)
+    if spans:
+        for span in spans:
+            sprite = _lxml_first(span, _XP_CHAMP_SPRITES)
+            if sprite is not None and sprite.get('title') is not None:
+                champions.append(sprite.get('title'))
+            elif span.get('data-champion') is not None:
+                champions.append(normalize_data_champion(span.get('data-champion')))
+            else:
+                champions.append("N/A")
+    else:
+        sprite = _lxml_first(cell, _XP_CHAMP_SPRITES)
+        if sprite is not None and sprite.get('title') is not None:
+            champions.append(sprite.get('title'))
+    return champions if champions else ["N/A"]
+
+def _lxml_table_rows(content, xpath):
+    if not content:
+        return
+    parser = lxml.html.HTMLParser(encoding='utf-8')
+    root = lxml.html.document_fromstring(content, parser=parser)
+    for table_index, table in enumerate(xpath(root)):
+        rows = _XP_ROWS(table)
+        yield table_index, [_XP_CELLS(row) for row in rows[1:]]
+
+def _lxml_extract_mh_rows(content):
+    for table_index, rows in _lxml_table_rows(content, _XP_MH_TABLES):
+        for i, cols in enumerate(rows):
+            if len(cols) < 9:
+                yield {'table_index': table_index, 'row_index': i, 'skip': f"cols={len(cols)} < 9"}
+                continue
+            try:
+                teams = [_lxml_team_name_from_mh_cell(cols[idx]) for idx in (2, 3, 4)]
+                bans = [_lxml_sprite_titles(cols[idx]) for idx in (5, 6)]
+                picks = [_lxml_sprite_titles(cols[idx]) for idx in (7, 8)]
+                yield _mh_row(table_index, i, _lxml_text(cols[0]).strip(), _lxml_text(cols[1]).strip(), teams, bans, picks)
+            except Exception as e:
+                yield {'table_index': table_index, 'row_index': i, 'error': e}
+
+def _lxml_extract_pb_rows(content):
+    for table_index, rows in _lxml_table_rows(content, _XP_PB_TABLES):
+        for i, cols in enumerate(rows):
+            if len(cols) < 22:
+                yield {'table_index': table_index, 'row_index': i, 'skip': f"cols={len(cols)} < 22"}
+                continue
+            try:
+                blue = cols[1].get('title', _lxml_text(cols[1])).strip().replace(INVISIBLE_CHARS, "")
+                red = cols[2].get('title', _lxml_text(cols[2])).strip().replace(INVISIBLE_CHARS, "")
+                winner_side = None
+                if 'pbh-winner' in cols[1].get('class', '').split(): winner_side = 'blue'
+                elif 'pbh-winner' in cols[2].get('class', '').split(): winner_side = 'red'
+                bans = ([_lxml_champion_from_draft_cell(cols[idx]) for idx in PB_BLUE_BAN_COLS],
+                        [_lxml_champion_from_draft_cell(cols[idx]) for idx in PB_RED_BAN_COLS])
+                pick_cells = {idx: _lxml_champions_from_draft_pick_cell(cols[idx]) for idx in PB_PICK_COLS}
+                col_links = []
+                for col in cols:
+                    link = _lxml_first(col, _XP_LINK)
+                    col_links.append(link.get('href') if link is not None else None)
+                yield _pb_row(table_index, i, _lxml_text(cols[0]).strip(), _lxml_text(cols[4]).strip(), blue, red, winner_side,
+                              bans, pick_cells, find_vod_link(col_links))
+            except Exception as e:
+                yield {'table_index': table_index, 'row_index': i, 'error': e}
+
+# --- Реестр бэкендов ---
+PARSER_BACKENDS = {
+    "bs4": {
+        "match_history": lambda content: _bs4_extract_mh_rows(content, 'html.parser'),
+        "picks_and_bans": lambda content: _bs4_extract_pb_rows(content, 'html.parser'),
+    },
+}
+if lxml is not None:
+    PARSER_BACKENDS["bs4-lxml"] = {
+        "match_history": lambda content: _bs4_extract_mh_rows(content, 'lxml'),
+        "picks_and_bans": lambda content: _bs4_extract_pb_rows(content, 'lxml'),
+    }
+    PARSER_BACKENDS["lxml"] = {
+        "match_history": _lxml_extract_mh_rows,
+        "picks_and_bans": _lxml_extract_pb_rows,
+    }
+
+DEFAULT_PARSER_BACKEND = os.getenv("WIKI_PARSER_BACKEND", "lxml" if lxml is not None else "bs4")
+
+def get_parser_backend(name=None):
+    name = name or DEFAULT_PARSER_BACKEND
+    if name not in PARSER_BACKENDS:
+        print(f"Unknown wiki parser backend '{name}', falling back to bs4")
+        name = "bs4"
+    return PARSER_BACKENDS[name]
+
+def extract_match_history_rows(content, backend=None):
+    """Строки всех MH таблиц страницы. Строки с ошибкой/пропуском содержат ключ 'error' или 'skip'."""
+    return list(get_parser_backend(backend)["match_history"](content))
+
+def extract_picks_and_bans_rows(content, backend=None):
+    """Строки всех P/B таблиц страницы. Строки с ошибкой/пропуском содержат ключ 'error' или 'skip'."""
+    return list(get_parser_backend(backend)["picks_and_bans"](content))